@@ -4,22 +4,33 @@ app.py
 Gradio web interface for YouTube Script Extractor.
 """
 
-import os
-import uuid
-import shutil
+import asyncio
+import logging
 import gradio as gr
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # Import the progressive processing function
 from src.pipeline import process_video_progressive
+from src.download import preload_youtube_dl
+from src.llm_segmentation import preload_gemini_model
+from src.cache import evict_cache
+from src.embedding_cache import evict_embeddings
 
+# Only surface warnings from the pipeline modules in the web app
+logging.getLogger("src").setLevel(logging.WARNING)
 
-def extract_transcript(youtube_url: str):
+# Single background worker so disk cleanup never delays a response
+_CLEANUP_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cleanup")
+
+
+async def extract_transcript(youtube_url: str):
     """
     Extract transcript from YouTube video with progressive updates.
 
+    Stage 0: Reports that the download has started
     Stage 1: Returns basic transcript immediately
-    Stage 2: Returns semantic segmentation when ready
+    Stage 2: Returns topics as they stream in from Gemini
+    Stage 3: Returns final semantic segmentation when ready
 
     Args:
         youtube_url: YouTube video URL
@@ -36,16 +47,22 @@ def extract_transcript(youtube_url: str):
         yield "⚠️ 유효한 YouTube URL을 입력해주세요.", "", ""
         return
 
-    # Create unique temporary directory for this request
-    session_id = str(uuid.uuid4())[:8]
-    temp_output_dir = os.path.join("data", f"session_{session_id}")
+    # Show progress right away instead of a blank UI during the download
+    yield "⏳ 자막 다운로드 중...", "", ""
 
     try:
-        # Process video progressively
-        for stage, data in process_video_progressive(
+        # Process video progressively (each step runs off the event loop)
+        # Nothing is written to disk: the UI only shows the rendered text
+        stages = process_video_progressive(
             video_url=youtube_url,
-            output_dir=temp_output_dir
-        ):
+            output_dir=None
+        )
+        while True:
+            item = await asyncio.to_thread(next, stages, None)
+            if item is None:
+                break
+            stage, data = item
+
             if stage == "basic":
                 # Stage 1: Basic transcript ready (FAST)
                 plain_content = data.get("content", "")
@@ -55,8 +72,17 @@ def extract_transcript(youtube_url: str):
                     "처리 중..."
                 )
 
+            elif stage == "semantic_partial":
+                # Stage 2: Topics streamed so far
+                semantic_content = data.get("content", "")
+                yield (
+                    "✅ 자막 다운로드 완료!\n\n⏳ 주제별 자막 생성 중...",
+                    plain_content,
+                    semantic_content
+                )
+
             elif stage == "semantic":
-                # Stage 2: Semantic segmentation ready (SLOW)
+                # Stage 3: Semantic segmentation ready (SLOW)
                 semantic_content = data.get("content", "")
                 yield (
                     "✅ 완료!",
@@ -77,29 +103,29 @@ def extract_transcript(youtube_url: str):
         else:
             yield f"❌ 오류: {error_msg}", "", ""
 
-    finally:
-        # Cleanup temporary files
-        try:
-            if os.path.exists(temp_output_dir):
-                shutil.rmtree(temp_output_dir)
-        except Exception as e:
-            print(f"Cleanup warning: {e}")
 
+def _warmup():
+    """Pay one-time setup costs (yt-dlp extractors, Gemini client) before the first request."""
+    preload_youtube_dl()
+    preload_gemini_model()
 
-def cleanup_old_sessions():
-    """Clean up old session directories to save disk space."""
-    data_dir = Path("data")
-    if not data_dir.exists():
-        return
 
+def cleanup_cache():
+    """Evict stale cache entries to save disk space."""
     try:
-        for session_dir in data_dir.glob("session_*"):
-            if session_dir.is_dir():
-                shutil.rmtree(session_dir)
+        # Keep the subtitle/Gemini cache bounded (LRU by age and size)
+        evict_cache()
+        # And the embedding store (LRU by age and row count)
+        evict_embeddings()
     except Exception as e:
         print(f"Cleanup warning: {e}")
 
 
+def schedule_cleanup():
+    """Run cleanup_cache on the background cleanup thread."""
+    _CLEANUP_POOL.submit(cleanup_cache)
+
+
 # Create Gradio interface
 with gr.Blocks(title="YouTube Script Extractor") as demo:
 
@@ -155,12 +181,13 @@ with gr.Blocks(title="YouTube Script Extractor") as demo:
         outputs=[status_output, plain_output, semantic_output]
     )
 
-    # Clean up old sessions on load
-    demo.load(cleanup_old_sessions)
+    # Clean up stale cache entries on load
+    demo.load(schedule_cleanup)
 
 
 # Launch the app
 if __name__ == "__main__":
+    _warmup()
     demo.launch(
         server_name="0.0.0.0",
         server_port=7860,
@@ -10,6 +10,7 @@ Usage:
 import sys
 import os
 import shutil
+import logging
 from src.pipeline import process_video
 
 
@@ -22,6 +23,9 @@ if __name__ == "__main__":
 
     video_url = sys.argv[1]
 
+    # Show pipeline progress messages on the console
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # Save to /home/bihsb/CD/src/extractor/data
     current_dir = os.path.dirname(os.path.abspath(__file__))
     output_dir = os.path.join(current_dir, "data")
@@ -10,15 +10,20 @@ Modules:
 - output: Multi-format output (CSV, TXT)
 """
 
-from .download import extract_video_info, download_subtitles
-from .preprocessing import parse_vtt_file, merge_by_time_window
+from .download import extract_video_info, download_subtitles, fetch_subtitles, get_video_info_and_subs
+from .preprocessing import VttStreamParser, parse_vtt_file, parse_vtt_string, parse_vtt_bytes, merge_by_time_window
 from .semantic_segmentation import segment_by_semantics
 from .output import save_all_outputs
 
 __all__ = [
     'extract_video_info',
     'download_subtitles',
+    'fetch_subtitles',
+    'get_video_info_and_subs',
+    'VttStreamParser',
     'parse_vtt_file',
+    'parse_vtt_string',
+    'parse_vtt_bytes',
     'merge_by_time_window',
     'segment_by_semantics',
     'save_all_outputs',
@@ -0,0 +1,148 @@
+"""
+cache.py
+──────────────────────────────────────────────
+On-disk cache shared by all requests.
+
+This module handles:
+- Subtitle cache (<video_id>.vtt, with id/title/language in <video_id>.json)
+- Gemini segmentation cache (gemini_<hash>.json)
+- Sentence embedding store (embeddings/ subdirectory, evicted per row by embedding_cache.py)
+- LRU eviction by age and total size
+- Atomic file writes (also used for the output files, see output.py)
+"""
+
+import os
+import time
+import uuid
+import hashlib
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Cache location (override with TRANSCRIPT_CACHE_DIR)
+CACHE_DIR = os.getenv('TRANSCRIPT_CACHE_DIR', os.path.join('data', 'cache'))
+
+
+def content_hash(*parts: str) -> str:
+    """
+    Build a short content hash used as a cache key.
+
+    Args:
+        *parts: Strings identifying the cached content
+
+    Returns:
+        str: Hex digest
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def read_cache(name: str) -> Optional[bytes]:
+    """
+    Read a cache entry and mark it as recently used.
+
+    Args:
+        name: Cache entry file name
+
+    Returns:
+        bytes: Cached data, or None on a miss
+    """
+    path = os.path.join(CACHE_DIR, name)
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        # Refresh mtime so eviction keeps recently used entries
+        os.utime(path)
+        return data
+    except OSError:
+        return None
+
+
+def atomic_write(path: str, data):
+    """
+    Write a whole file in one call via a temp file and os.replace.
+
+    Readers never see a partially written file, even if the process dies mid-write.
+    The file gets the usual permissions (umask), unlike a mkstemp temp file (0600).
+
+    Args:
+        path: Destination path
+        data: File content (str is encoded as UTF-8)
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    # Same directory, so os.replace stays an atomic rename
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, 'xb', buffering=1 << 20) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_cache(name: str, data: bytes):
+    """
+    Write a cache entry atomically (concurrent readers never see partial files).
+
+    Args:
+        name: Cache entry file name
+        data: Data to store
+    """
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        atomic_write(os.path.join(CACHE_DIR, name), data)
+    except OSError as e:
+        logger.warning("   ⚠️  Cache write failed: %s", e)
+
+
+def evict_cache(max_age_days: float = None, max_size_mb: float = None):
+    """
+    Remove stale cache entries, least recently used first.
+
+    Only top-level entry files are evicted; the embedding store in its own
+    subdirectory is bounded by embedding_cache.evict_embeddings.
+
+    Args:
+        max_age_days: Remove entries unused for longer than this
+                      (default: CACHE_MAX_AGE_DAYS or 7)
+        max_size_mb: Then remove oldest entries until the cache fits
+                     (default: CACHE_MAX_SIZE_MB or 500)
+    """
+    if max_age_days is None:
+        max_age_days = float(os.getenv('CACHE_MAX_AGE_DAYS', '7'))
+    if max_size_mb is None:
+        max_size_mb = float(os.getenv('CACHE_MAX_SIZE_MB', '500'))
+
+    if not os.path.isdir(CACHE_DIR):
+        return
+
+    entries = []
+    for entry in os.scandir(CACHE_DIR):
+        if entry.is_file():
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    # Least recently used first
+    entries.sort()
+    cutoff = time.time() - max_age_days * 86400
+    total_size = sum(size for _, size, _ in entries)
+    max_size = max_size_mb * 1024 * 1024
+
+    for mtime, size, path in entries:
+        if mtime >= cutoff and total_size <= max_size:
+            break
+        try:
+            os.remove(path)
+            total_size -= size
+        except OSError:
+            pass
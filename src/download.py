@@ -9,7 +9,89 @@ This module handles:
 """
 
 import os
+import re
+import queue
+import logging
+import orjson
 import yt_dlp
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Tuple
+
+from .cache import read_cache, write_cache
+
+logger = logging.getLogger(__name__)
+
+YDL_OPTS = {
+    'quiet': True,
+    'no_warnings': True,
+    # Add extractor args to handle PO token requirement
+    'extractor_args': {
+        'youtube': {
+            'player_client': ['android', 'web'],
+            'skip': ['dash', 'hls']
+        }
+    }
+}
+
+# Idle YoutubeDL instances shared across requests. Reusing an instance keeps
+# its HTTP session (and keep-alive connections to YouTube) open.
+_ydl_pool: "queue.LifoQueue[yt_dlp.YoutubeDL]" = queue.LifoQueue()
+
+
+@contextmanager
+def _borrow_ydl() -> Iterator[yt_dlp.YoutubeDL]:
+    """
+    Borrow a YoutubeDL instance from the pool (one request at a time per instance).
+
+    Yields:
+        YoutubeDL: Instance configured with YDL_OPTS
+    """
+    try:
+        ydl = _ydl_pool.get_nowait()
+    except queue.Empty:
+        ydl = yt_dlp.YoutubeDL(YDL_OPTS)
+
+    try:
+        yield ydl
+    finally:
+        _ydl_pool.put(ydl)
+
+
+def preload_youtube_dl():
+    """
+    Create a pooled YoutubeDL instance and load its YouTube extractor ahead of time.
+
+    Errors are only reported here; the download raises them again when it runs.
+    """
+    try:
+        with _borrow_ydl() as ydl:
+            ydl.get_info_extractor('Youtube')
+    except Exception as e:
+        logger.warning("   ⚠️  yt-dlp preload skipped: %s", e)
+
+
+def _to_video_info(info: dict, video_url: str) -> dict:
+    """
+    Reduce yt-dlp's info dict to the metadata used by the pipeline.
+
+    Args:
+        info: Info dict returned by yt-dlp's extract_info
+        video_url: YouTube video URL
+
+    Returns:
+        dict: Video metadata (id, title, url)
+    """
+    video_id = info.get('id')
+    video_title = info.get('title', 'unknown_title')
+
+    logger.info("   Video ID: %s", video_id)
+    logger.info("   Title: %s", video_title)
+
+    return {
+        'id': video_id,
+        'title': video_title,
+        'url': video_url
+    }
 
 
 def extract_video_info(video_url: str) -> dict:
@@ -25,29 +107,200 @@ def extract_video_info(video_url: str) -> dict:
     Raises:
         Exception: If video info extraction fails
     """
-    print(f"🔍 Extracting video info...")
-
-    ydl_opts = {
-        'quiet': True,
-        'no_warnings': True,
-    }
+    logger.info("🔍 Extracting video info...")
 
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with _borrow_ydl() as ydl:
             info = ydl.extract_info(video_url, download=False)
-            video_id = info.get('id')
-            video_title = info.get('title', 'unknown_title')
+            return _to_video_info(info, video_url)
+    except Exception as e:
+        raise Exception(f"Failed to extract video info: {e}")
+
+
+# Subtitle languages in order of preference
+SUBTITLE_LANGS = ['en', 'ko']
+
+# Read size for streaming the subtitle response
+SUBTITLE_CHUNK_SIZE = 8192
+
+# Video ID in watch (?v=), youtu.be, shorts, embed and live URLs
+_VIDEO_ID_RE = re.compile(
+    r'(?:[?&]v=|youtu\.be/|/(?:shorts|embed|live|v)/)([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])'
+)
+
+
+def _select_subtitle_track(info: dict) -> Tuple[str, str]:
+    """
+    Pick the subtitle track to download from extracted video info.
+
+    Priority: English > Korean > Any available language
+    (uploaded subtitles are preferred over auto-generated ones)
+
+    Args:
+        info: Info dict returned by yt-dlp's extract_info
+
+    Returns:
+        tuple: (language code, VTT url)
 
-            print(f"   Video ID: {video_id}")
-            print(f"   Title: {video_title}")
+    Raises:
+        Exception: If no VTT subtitles are available
+    """
+    manual = info.get('subtitles') or {}
+    auto = info.get('automatic_captions') or {}
+
+    candidates = [(lang, tracks) for lang in SUBTITLE_LANGS for tracks in (manual.get(lang), auto.get(lang))]
+    candidates += list(manual.items())
+    # Auto-generated captions in the video's own language ("xx-orig"), not machine translations
+    candidates += [(lang, tracks) for lang, tracks in auto.items() if lang.endswith('-orig')]
+
+    for lang, tracks in candidates:
+        for track in tracks or []:
+            if track.get('ext') == 'vtt' and track.get('url'):
+                return lang, track['url']
+
+    raise Exception("No subtitles available for this video")
+
+
+def _parse_video_id(video_url: str) -> Optional[str]:
+    """
+    Get the video ID from a YouTube URL without a network request.
+
+    Args:
+        video_url: YouTube video URL (watch, youtu.be, shorts, embed or live)
+
+    Returns:
+        str: 11-character video ID, or None if the URL has no recognizable ID
+    """
+    match = _VIDEO_ID_RE.search(video_url)
+    return match.group(1) if match else None
+
+
+def _load_cached_subtitles(video_id: str) -> Optional[Tuple[dict, str, bytes]]:
+    """
+    Load subtitles and video metadata cached by an earlier request.
 
-            return {
-                'id': video_id,
-                'title': video_title,
-                'url': video_url
-            }
+    Args:
+        video_id: YouTube video ID
+
+    Returns:
+        tuple: (video metadata (id, title), language code, raw VTT bytes), or None on a miss
+    """
+    meta = read_cache(f"{video_id}.json")
+    data = read_cache(f"{video_id}.vtt")
+    if meta is None or data is None:
+        return None
+
+    try:
+        info = orjson.loads(meta)
+    except orjson.JSONDecodeError:
+        return None
+    return info, info.get('lang'), data
+
+
+def _extract_with_subtitles(video_url: str,
+                            on_chunk: Optional[Callable[[bytes], None]] = None) -> Tuple[dict, str, bytes]:
+    """
+    Extract video info and fetch the preferred subtitle track with one pooled YoutubeDL.
+
+    Videos fetched before are served from the cache without calling yt-dlp.
+
+    Args:
+        video_url: YouTube video URL
+        on_chunk: Optional callback receiving the VTT bytes as they arrive
+
+    Returns:
+        tuple: (yt-dlp info dict, or cached id/title, language code, raw VTT bytes)
+
+    Raises:
+        Exception: If subtitle download fails or no subtitles available
+    """
+    # Reuse subtitles and metadata fetched by an earlier request
+    video_id = _parse_video_id(video_url)
+    cached = _load_cached_subtitles(video_id) if video_id else None
+    if cached is not None:
+        info, lang, data = cached
+        logger.info("   ✅ Subtitles loaded from cache (%s)", lang)
+        if on_chunk:
+            on_chunk(data)
+        return info, lang, data
+
+    try:
+        with _borrow_ydl() as ydl:
+            info = ydl.extract_info(video_url, download=False)
+            lang, vtt_url = _select_subtitle_track(info)
+
+            # Single GET for the VTT file (no yt-dlp download step),
+            # handing each chunk to the caller while the rest is in flight
+            response = ydl.urlopen(vtt_url)
+            chunks = []
+            while True:
+                chunk = response.read(SUBTITLE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                if on_chunk:
+                    on_chunk(chunk)
+            data = b''.join(chunks)
     except Exception as e:
-        raise Exception(f"Failed to extract video info: {e}")
+        raise Exception(f"Failed to download subtitles: {e}")
+
+    # Cache under the extracted ID only (never under a missing one)
+    video_id = info.get('id')
+    if video_id:
+        write_cache(f"{video_id}.vtt", data)
+        write_cache(f"{video_id}.json", orjson.dumps({
+            'id': video_id,
+            'title': info.get('title', 'unknown_title'),
+            'lang': lang
+        }))
+
+    logger.info("   ✅ Subtitles downloaded (%s)", lang)
+    return info, lang, data
+
+
+def get_video_info_and_subs(video_url: str,
+                            on_chunk: Optional[Callable[[bytes], None]] = None) -> Tuple[dict, bytes]:
+    """
+    Extract video metadata and download subtitles in a single pass.
+
+    Priority: English > Korean > Any available language
+
+    Args:
+        video_url: YouTube video URL
+        on_chunk: Optional callback receiving the VTT bytes as they arrive
+                  (e.g. VttStreamParser.feed, to parse during the download)
+
+    Returns:
+        tuple: (video metadata (id, title, url), raw VTT bytes)
+
+    Raises:
+        Exception: If extraction fails or no subtitles available
+    """
+    logger.info("🔍 Extracting video info and subtitles...")
+
+    info, _, content = _extract_with_subtitles(video_url, on_chunk=on_chunk)
+    return _to_video_info(info, video_url), content
+
+
+def fetch_subtitles(video_url: str) -> bytes:
+    """
+    Download subtitles for a video into memory (any available language).
+
+    Priority: English > Korean > Any available language
+
+    Args:
+        video_url: YouTube video URL
+
+    Returns:
+        bytes: Raw VTT subtitle content
+
+    Raises:
+        Exception: If subtitle download fails or no subtitles available
+    """
+    logger.info("📥 Downloading subtitles...")
+
+    _, _, content = _extract_with_subtitles(video_url)
+    return content
 
 
 def download_subtitles(video_url: str, video_id: str, output_dir: str) -> str:
@@ -67,62 +320,13 @@ def download_subtitles(video_url: str, video_id: str, output_dir: str) -> str:
     Raises:
         Exception: If subtitle download fails or no subtitles available
     """
-    print(f"📥 Downloading subtitles...")
-
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Try downloading with error handling
-    import glob
-
-    ydl_opts = {
-        'writesubtitles': True,
-        'writeautomaticsub': True,
-        'subtitleslangs': ['en', 'ko'],  # Prefer English, then Korean
-        'skip_download': True,
-        'outtmpl': f"{output_dir}/{video_id}.%(ext)s",
-        'quiet': True,
-        'no_warnings': True,
-        'ignoreerrors': True,  # Continue on download errors
-        # Add extractor args to handle PO token requirement
-        'extractor_args': {
-            'youtube': {
-                'player_client': ['android', 'web'],
-                'skip': ['dash', 'hls']
-            }
-        }
-    }
+    logger.info("📥 Downloading subtitles...")
 
-    try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([video_url])
-
-        # Try to find downloaded subtitle file
-        # Priority: en > ko > any other language
-        possible_paths = [
-            os.path.join(output_dir, f"{video_id}.en.vtt"),
-            os.path.join(output_dir, f"{video_id}.ko.vtt"),
-        ]
-
-        # Check if any of the preferred subtitles exist
-        for vtt_path in possible_paths:
-            if os.path.exists(vtt_path):
-                lang = "English" if ".en." in vtt_path else "Korean"
-                print(f"   ✅ Subtitles downloaded ({lang})")
-                return vtt_path
-
-        # If no preferred language, find any .vtt file
-        vtt_files = glob.glob(os.path.join(output_dir, f"{video_id}.*.vtt"))
-        if vtt_files:
-            print(f"   ✅ Subtitles downloaded")
-            return vtt_files[0]
-
-        raise Exception("No subtitles available for this video")
+    _, lang, content = _extract_with_subtitles(video_url)
 
-    except Exception as e:
-        # Check if any subtitle was downloaded despite the error
-        vtt_files = glob.glob(os.path.join(output_dir, f"{video_id}.*.vtt"))
-        if vtt_files:
-            print(f"   ✅ Subtitles downloaded (with warnings)")
-            return vtt_files[0]
+    os.makedirs(output_dir, exist_ok=True)
+    vtt_path = os.path.join(output_dir, f"{video_id}.{lang}.vtt")
+    with open(vtt_path, 'wb') as f:
+        f.write(content)
 
-        raise Exception(f"Failed to download subtitles: {e}")
+    return vtt_path
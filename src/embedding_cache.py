@@ -0,0 +1,219 @@
+"""
+embedding_cache.py
+──────────────────────────────────────────────
+On-disk cache of sentence embeddings.
+
+This module handles:
+- Content-addressed lookup per (model, sentence)
+- An in-process LRU of recently used embeddings in front of the disk store
+- Encoding only the sentences missing from the cache
+- A SQLite store keyed by content hash (embeddings/embeddings.sqlite3 in the
+  shared cache directory): lookups and inserts only touch their own rows
+- Evicting least recently used rows by age and count
+- Embeddings are kept as float16 (half the disk, memory and bandwidth)
+"""
+
+import os
+import time
+import logging
+import sqlite3
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List
+
+from . import cache
+from .cache import content_hash
+
+logger = logging.getLogger(__name__)
+
+# Storage dtype of the embeddings (unit vectors: float16 keeps ~3 significant digits)
+EMBEDDING_DTYPE = np.float16
+
+# Keys per SQL statement (stays below SQLite's bound parameter limit)
+_SQL_BATCH_SIZE = 500
+
+# Serializes store writes within this process (SQLite locks across processes)
+_store_lock = threading.Lock()
+
+# In-process LRU of recently used embeddings per cache key (e.g. a growing
+# transcript segmented repeatedly only loads/encodes its new sentences)
+MEMORY_CACHE_SIZE = 10000
+_memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _store_path() -> str:
+    """Path of the embedding store (own directory, so file-level cache eviction skips it)."""
+    return os.path.join(cache.CACHE_DIR, 'embeddings', 'embeddings.sqlite3')
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the embedding store, creating it on first use."""
+    path = _store_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS embeddings ("
+        "key TEXT PRIMARY KEY, vector BLOB NOT NULL, used REAL NOT NULL)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS embeddings_used ON embeddings (used)")
+    return conn
+
+
+def _load_rows(keys: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Load stored embeddings and mark them as recently used.
+
+    Args:
+        keys: Cache keys to look up
+
+    Returns:
+        dict: Embedding per cache key found in the store
+    """
+    rows = {}
+    try:
+        conn = _connect()
+        try:
+            for i in range(0, len(keys), _SQL_BATCH_SIZE):
+                batch = keys[i:i + _SQL_BATCH_SIZE]
+                placeholders = ','.join('?' * len(batch))
+                for key, vector in conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch):
+                    rows[key] = np.frombuffer(vector, dtype=EMBEDDING_DTYPE)
+
+            if rows:
+                # Refresh last use so eviction keeps these rows
+                found = list(rows)
+                now = time.time()
+                with _store_lock, conn:
+                    for i in range(0, len(found), _SQL_BATCH_SIZE):
+                        batch = found[i:i + _SQL_BATCH_SIZE]
+                        placeholders = ','.join('?' * len(batch))
+                        conn.execute(
+                            f"UPDATE embeddings SET used = ? WHERE key IN ({placeholders})",
+                            [now, *batch]
+                        )
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning("   ⚠️  Ignoring unreadable embedding cache: %s", e)
+    return rows
+
+
+def _save_rows(keys: List[str], vectors: np.ndarray):
+    """
+    Add new embeddings to the store.
+
+    Args:
+        keys: Cache keys of the new embeddings
+        vectors: New embeddings (one row per key)
+    """
+    now = time.time()
+    try:
+        conn = _connect()
+        try:
+            with _store_lock, conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector, used) VALUES (?, ?, ?)",
+                    ((key, vector.tobytes(), now) for key, vector in zip(keys, vectors))
+                )
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning("   ⚠️  Embedding cache write failed: %s", e)
+
+
+def evict_embeddings(max_age_days: float = None, max_entries: int = None):
+    """
+    Remove stale embeddings from the store, least recently used first.
+
+    Args:
+        max_age_days: Remove embeddings unused for longer than this
+                      (default: CACHE_MAX_AGE_DAYS or 7)
+        max_entries: Then remove oldest embeddings until at most this many remain
+                     (default: EMBEDDING_CACHE_MAX_ENTRIES or 200000)
+    """
+    if max_age_days is None:
+        max_age_days = float(os.getenv('CACHE_MAX_AGE_DAYS', '7'))
+    if max_entries is None:
+        max_entries = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', '200000'))
+
+    if not os.path.exists(_store_path()):
+        return
+
+    cutoff = time.time() - max_age_days * 86400
+    conn = _connect()
+    try:
+        with _store_lock, conn:
+            conn.execute("DELETE FROM embeddings WHERE used < ?", (cutoff,))
+            conn.execute(
+                "DELETE FROM embeddings WHERE key IN ("
+                "SELECT key FROM embeddings ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (max_entries,)
+            )
+    finally:
+        conn.close()
+
+
+def get_or_compute(sentences: List[str], model, model_name: str, batch_size: int = 64) -> np.ndarray:
+    """
+    Get normalized sentence embeddings, encoding only the ones not cached yet.
+
+    Args:
+        sentences: Sentences to embed
+        model: SentenceTransformer model used for cache misses
+        model_name: Name of the model (part of the cache key)
+        batch_size: Encode batch size for cache misses (default: 64)
+
+    Returns:
+        np.ndarray: One float16 embedding row per sentence
+    """
+    if not sentences:
+        return np.empty((0, 0), dtype=EMBEDDING_DTYPE)
+
+    keys = [content_hash(model_name, sentence) for sentence in sentences]
+
+    # Recently used embeddings are served from memory (no store lookup)
+    with _memory_lock:
+        rows = {key: _memory[key] for key in keys if key in _memory}
+        for key in rows:
+            _memory.move_to_end(key)
+
+    # Then the on-disk store, for the rest
+    pending = {}
+    for key, sentence in zip(keys, sentences):
+        if key not in rows:
+            pending[key] = sentence
+
+    missing = {}
+    if pending:
+        rows.update(_load_rows(list(pending)))
+
+        # Encode each missing sentence once
+        missing = {key: sentence for key, sentence in pending.items() if key not in rows}
+
+    if missing:
+        # Encode in length order so each batch pads to similar lengths
+        # (rows are looked up by key, so no un-sorting is needed)
+        missing = dict(sorted(missing.items(), key=lambda item: len(item[1])))
+        new_vectors = np.asarray(model.encode(
+            list(missing.values()),
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        ), dtype=EMBEDDING_DTYPE)
+        _save_rows(list(missing.keys()), new_vectors)
+        rows.update(zip(missing, new_vectors))
+
+    if pending:
+        with _memory_lock:
+            _memory.update((key, rows[key]) for key in pending)
+            while len(_memory) > MEMORY_CACHE_SIZE:
+                _memory.popitem(last=False)
+
+    logger.info("   💾 Embeddings: %d cached, %d encoded", len(sentences) - len(missing), len(missing))
+
+    # Rows in sentence order
+    return np.stack([rows[key] for key in keys])
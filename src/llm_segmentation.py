@@ -9,44 +9,37 @@ This module uses Gemini 2.0 Flash (free) to:
 """
 
 import os
+import re
+import time
+import difflib
+import string
+import random
+import logging
+import threading
+import orjson
+import numpy as np
 import pandas as pd
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Generator, List, Tuple
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from dotenv import load_dotenv
 
-# Load .env file from project root
-load_dotenv()
-
+from .cache import content_hash, read_cache, write_cache
 
-def segment_with_gemini(df_merged: pd.DataFrame, api_key: str = None) -> Tuple[List[List[str]], List[str]]:
-    """
-    Segment transcript into semantic paragraphs using Gemini LLM.
+logger = logging.getLogger(__name__)
 
-    Args:
-        df_merged: DataFrame with merged transcript segments
-        api_key: Google AI API key (or use GEMINI_API_KEY from .env file)
-
-    Returns:
-        tuple: (paragraphs, topic_titles)
-            - paragraphs: List of paragraphs (each is a list of sentences)
-            - topic_titles: List of topic titles for each paragraph
-    """
-    # Get API key from parameter or environment variable
-    if api_key is None:
-        api_key = os.getenv('GEMINI_API_KEY')
-
-    if not api_key:
-        raise Exception("GEMINI_API_KEY not found. Please set it in .env file or pass it as parameter.")
+# Load .env file from project root
+load_dotenv()
 
-    # Configure Gemini
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.5-flash-lite')
+GEMINI_MODEL_NAME = 'gemini-2.5-flash-lite'
 
-    # Prepare full transcript
-    full_text = ' '.join(df_merged['text'].tolist())
+# Bump when the prompt changes so cached segmentations are not reused
+PROMPT_VERSION = 2
 
-    # Create prompt
-    prompt = f"""You are a transcript segmentation expert. Analyze the following transcript and divide it into logical topic-based segments.
+# Static segmentation instructions, sent once as the model's system instruction;
+# each request only carries the transcript text
+_SYSTEM_PROMPT = """You are a transcript segmentation expert. Analyze the transcript sent by the user and divide it into logical topic-based segments.
 
 For each segment:
 1. Group related sentences together that discuss the same topic
@@ -63,18 +56,15 @@ For each segment:
      * "Discussion"
 
 Format your response as JSON:
-{{
+{
   "segments": [
-    {{
+    {
       "title": "Specific descriptive title summarizing the main point",
       "text": "Full text of this segment..."
-    }},
+    },
     ...
   ]
-}}
-
-Transcript:
-{full_text}
+}
 
 Important:
 - Keep the original text EXACTLY as is (don't modify, summarize, or translate)
@@ -84,60 +74,504 @@ Important:
 - The number of topic should be 8-15
 """
 
+# Transcripts longer than WINDOW_ROWS rows are segmented in overlapping windows
+WINDOW_ROWS = 200
+WINDOW_OVERLAP_ROWS = 20
+
+# Transcripts below either threshold skip Gemini and use simple_segmentation
+# (rows are time-window merged segments, ~25s each)
+GEMINI_MIN_ROWS = int(os.getenv('GEMINI_MIN_ROWS', '5'))
+GEMINI_MIN_CHARS = int(os.getenv('GEMINI_MIN_CHARS', '1500'))
+
+# Share of the overlap's words that must align for a trim by alignment
+# (below it, the overlap rows' word count is trimmed instead)
+OVERLAP_MIN_MATCH = 0.5
+
+# Merge the topics on either side of a window boundary above this word overlap
+BOUNDARY_MERGE_JACCARD = 0.3
+
+# JSON object inside a markdown code block (fallback when the braces alone don't parse)
+_JSON_FENCE_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+
+# A sentence ends at terminal punctuation followed by whitespace (or at end of text)
+_SENTENCE_RE = re.compile(r'\S.*?(?:[.!?]+(?=\s|$)|$)', re.DOTALL)
+
+# Bound concurrent Gemini requests (across users and windows) to stay under the rate limit
+_gemini_semaphore = threading.BoundedSemaphore(int(os.getenv('GEMINI_CONCURRENCY', '4')))
+
+# Retries for rate-limited (429) requests, with exponential backoff and full jitter
+GEMINI_MAX_RETRIES = 4
+GEMINI_BACKOFF_SECONDS = 2.0
+
+# Configured model shared across requests (see get_gemini_model)
+_model = None
+_model_api_key = None
+_model_lock = threading.Lock()
+
+
+def get_gemini_model(api_key: str = None) -> genai.GenerativeModel:
+    """
+    Get the shared Gemini model, configuring the client on first use.
+
+    Args:
+        api_key: Google AI API key (or use GEMINI_API_KEY from .env file)
+
+    Returns:
+        GenerativeModel: Cached Gemini model
+
+    Raises:
+        Exception: If no API key is available
+    """
+    global _model, _model_api_key
+
+    # Get API key from parameter or environment variable
+    if api_key is None:
+        api_key = os.getenv('GEMINI_API_KEY')
+
+    if not api_key:
+        raise Exception("GEMINI_API_KEY not found. Please set it in .env file or pass it as parameter.")
+
+    with _model_lock:
+        if _model is None or _model_api_key != api_key:
+            genai.configure(api_key=api_key)
+            _model = genai.GenerativeModel(GEMINI_MODEL_NAME, system_instruction=_SYSTEM_PROMPT)
+            _model_api_key = api_key
+        return _model
+
+
+def preload_gemini_model():
+    """
+    Initialize the shared Gemini model ahead of time.
+
+    Errors are only reported here; segmentation raises them again when it runs.
+    """
     try:
-        # Call Gemini API
-        print("   🤖 Calling Gemini API...")
-        response = model.generate_content(prompt)
-        result_text = response.text
+        get_gemini_model()
+    except Exception as e:
+        logger.warning("   ⚠️  Gemini preload skipped: %s", e)
+
+
+class _SegmentStreamParser:
+    """
+    Incrementally extract objects from the "segments" array of a streamed JSON reply.
 
-        print(f"   📝 Gemini response length: {len(result_text)} characters")
+    Tracks brace depth (ignoring braces inside strings) so each segment object
+    can be decoded as soon as its closing brace arrives.
+    """
 
-        # Parse JSON response
-        import json
-        import re
+    def __init__(self):
+        self.buffer = ""
+        self.done = False
+        self._pos = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._obj_start = 0
+
+    def feed(self, text: str) -> List[dict]:
+        """
+        Append a chunk of response text and return newly completed segments.
+
+        Args:
+            text: Next chunk of the streamed response
+
+        Returns:
+            List of segment dicts completed by this chunk
+        """
+        self.buffer += text
+        completed = []
+
+        if self._pos < 0:
+            key = self.buffer.find('"segments"')
+            bracket = self.buffer.find('[', key) if key >= 0 else -1
+            if bracket < 0:
+                return completed
+            self._pos = bracket + 1
+
+        buf = self.buffer
+        i = self._pos
+        while i < len(buf) and not self.done:
+            ch = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{':
+                if self._depth == 0:
+                    self._obj_start = i
+                self._depth += 1
+            elif ch == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.append(orjson.loads(buf[self._obj_start:i + 1]))
+            elif ch == ']' and self._depth == 0:
+                self.done = True
+            i += 1
+
+        self._pos = i
+        return completed
+
+
+def _parse_full_response(result_text: str) -> List[dict]:
+    """
+    Parse a complete Gemini response and return its segments.
+
+    Args:
+        result_text: Full response text (raw JSON or inside a markdown code block)
 
+    Returns:
+        List of segment dicts (empty if the response is not valid JSON)
+    """
+    # Fast path: the outermost braces (raw JSON or a single code block)
+    start = result_text.find('{')
+    end = result_text.rfind('}')
+    result = None
+    if 0 <= start < end:
+        try:
+            result = orjson.loads(result_text[start:end + 1])
+        except orjson.JSONDecodeError:
+            pass
+
+    if result is None:
         # Extract JSON from markdown code blocks if present
-        json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', result_text, re.DOTALL)
+        json_match = _JSON_FENCE_RE.search(result_text)
         if json_match:
             json_str = json_match.group(1)
-            print("   ✅ Found JSON in markdown code block")
+            logger.info("   ✅ Found JSON in markdown code block")
         else:
             json_str = result_text
-            print("   ℹ️  Using raw response as JSON")
+            logger.info("   ℹ️  Using raw response as JSON")
+        try:
+            result = orjson.loads(json_str)
+        except orjson.JSONDecodeError as e:
+            logger.warning("   ⚠️  Gemini response is not valid JSON: %s", e)
+            return []
 
-        result = json.loads(json_str)
-        print(f"   ✅ Successfully parsed JSON")
+    logger.info("   ✅ Successfully parsed JSON")
+    return result.get('segments', [])
 
-        # Extract segments
-        segments = result.get('segments', [])
 
-        if not segments:
-            raise Exception("No segments found in Gemini response")
+def _segment_to_paragraph(segment: dict) -> Tuple[str, List[str]]:
+    """
+    Convert a Gemini segment object into a (title, sentences) pair.
 
-        # Convert to expected format
-        paragraphs = []
-        topic_titles = []
+    Args:
+        segment: Segment dict with "title" and "text" keys
+
+    Returns:
+        tuple: (title, sentences)
+    """
+    title = segment.get('title', 'Untitled')
+    text = segment.get('text', '')
+
+    # Split text into sentences (one regex pass; "3.14" stays intact)
+    sentences = [m.group(0).strip() for m in _SENTENCE_RE.finditer(text)]
 
-        for segment in segments:
-            title = segment.get('title', 'Untitled')
-            text = segment.get('text', '')
+    return title, sentences
 
-            # Split text into sentences (simple split by '. ')
-            sentences = [s.strip() + '.' for s in text.split('. ') if s.strip()]
-            if sentences:
-                # Remove trailing dot from last sentence if it has double dots
-                if sentences[-1].endswith('..'):
-                    sentences[-1] = sentences[-1][:-1]
 
+def _stream_text_segments(full_text: str, api_key: str = None) -> Generator[dict, None, None]:
+    """
+    Stream raw segment objects from Gemini for one piece of transcript text.
+
+    Args:
+        full_text: Transcript text to segment
+        api_key: Google AI API key (or use GEMINI_API_KEY from .env file)
+
+    Yields:
+        dict: Segment objects ({"title", "text"}) as they complete
+
+    Raises:
+        Exception: If the API call fails or the response has no segments
+    """
+    # Reuse the result of an identical earlier request
+    cache_name = f"gemini_{content_hash(GEMINI_MODEL_NAME, str(PROMPT_VERSION), full_text)}.json"
+    cached = read_cache(cache_name)
+    if cached is not None:
+        logger.info("   ✅ Gemini segmentation loaded from cache")
+        yield from orjson.loads(cached)
+        return
+
+    # Call Gemini API (instructions are already attached to the model)
+    model = get_gemini_model(api_key)
+    segments = []
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        parser = _SegmentStreamParser()
+        try:
+            with _gemini_semaphore:
+                logger.info("   🤖 Calling Gemini API (streaming)...")
+                response = model.generate_content(full_text, stream=True)
+                for chunk in response:
+                    for segment in parser.feed(chunk.text):
+                        segments.append(segment)
+                        yield segment
+            break
+        except google_exceptions.ResourceExhausted:
+            # Segments already yielded cannot be retracted, so only retry a clean failure
+            if segments or attempt == GEMINI_MAX_RETRIES:
+                raise
+            delay = random.uniform(0, GEMINI_BACKOFF_SECONDS * 2 ** attempt)
+            logger.warning("   ⏳ Gemini rate limited, retrying in %.1fs...", delay)
+            time.sleep(delay)
+
+    logger.info("   📝 Gemini response length: %d characters", len(parser.buffer))
+
+    # Response did not stream as expected - parse it as a whole
+    if not segments:
+        for segment in _parse_full_response(parser.buffer):
+            segments.append(segment)
+            yield segment
+
+    if not segments:
+        raise Exception("No segments found in Gemini response")
+
+    write_cache(cache_name, orjson.dumps(segments))
+
+
+def _segment_window(window_text: str, api_key: str = None) -> List[Tuple[str, List[str]]]:
+    """
+    Segment one transcript window with Gemini (runs in a worker thread).
+
+    Args:
+        window_text: Transcript text of the window
+        api_key: Google AI API key (or use GEMINI_API_KEY from .env file)
+
+    Returns:
+        List of (title, sentences) pairs
+    """
+    return [_segment_to_paragraph(segment) for segment in _stream_text_segments(window_text, api_key)]
+
+
+def _paragraph_words(paragraphs: List[Tuple[str, List[str]]]) -> List[str]:
+    """
+    Words of a window's paragraphs, normalized for overlap matching.
+
+    Case and surrounding punctuation are ignored, since Gemini may
+    re-punctuate the same transcript words differently per window.
+
+    Args:
+        paragraphs: List of (title, sentences) pairs
+
+    Returns:
+        List of normalized words (one per word of the paragraphs)
+    """
+    return [
+        word.lower().strip(string.punctuation)
+        for _, sentences in paragraphs
+        for sentence in sentences
+        for word in sentence.split()
+    ]
+
+
+def _overlap_length(prev_words: List[str], words: List[str], expected: int) -> int:
+    """
+    Find how many leading words of a window repeat the end of the previous window.
+
+    Only the known overlap region is aligned (the previous window's tail and
+    this window's head, about `expected` words each), tolerantly, since Gemini
+    may re-tokenize, drop filler words or fix typos there.
+
+    Args:
+        prev_words: Normalized words of the previous window
+        words: Normalized words of this window
+        expected: Word count of the overlapping transcript rows
+
+    Returns:
+        int: Number of leading words to drop (`expected` if the alignment fails)
+    """
+    if expected <= 0:
+        return 0
+
+    # Some slack on both sides for words Gemini added or dropped
+    span = expected + expected // 2
+    tail = prev_words[-span:]
+    head = words[:span]
+
+    matcher = difflib.SequenceMatcher(None, tail, head, autojunk=False)
+    blocks = [block for block in matcher.get_matching_blocks() if block.size]
+    if sum(block.size for block in blocks) < expected * OVERLAP_MIN_MATCH:
+        return min(expected, len(words))
+
+    # Cut after the last matched block; unmatched words still left at the end
+    # of the tail pair up with the words that follow in the head
+    a, b, size = blocks[-1]
+    return min(b + size + len(tail) - (a + size), len(head))
+
+
+def _drop_leading_words(paragraphs: List[Tuple[str, List[str]]], num_words: int) -> List[Tuple[str, List[str]]]:
+    """
+    Remove the first num_words words from a window's paragraphs.
+
+    Used to cut the words a window repeats from the previous window.
+
+    Args:
+        paragraphs: List of (title, sentences) pairs
+        num_words: Number of leading words to remove
+
+    Returns:
+        List of (title, sentences) pairs (empty paragraphs removed)
+    """
+    result = []
+    for title, sentences in paragraphs:
+        kept = []
+        for sentence in sentences:
+            if num_words > 0:
+                words = sentence.split()
+                if len(words) <= num_words:
+                    num_words -= len(words)
+                    continue
+                sentence = ' '.join(words[num_words:])
+                num_words = 0
+            kept.append(sentence)
+        if kept:
+            result.append((title, kept))
+    return result
+
+
+def _jaccard(sentences_a: List[str], sentences_b: List[str]) -> float:
+    """
+    Jaccard similarity between the word sets of two paragraphs.
+
+    Args:
+        sentences_a: Sentences of the first paragraph
+        sentences_b: Sentences of the second paragraph
+
+    Returns:
+        float: Similarity in [0, 1]
+    """
+    words_a = set(' '.join(sentences_a).lower().split())
+    words_b = set(' '.join(sentences_b).lower().split())
+    union = words_a | words_b
+    return len(words_a & words_b) / len(union) if union else 0.0
+
+
+def _is_short_transcript(df_merged: pd.DataFrame) -> bool:
+    """
+    Check whether a transcript is too short to be worth a Gemini round trip.
+
+    Args:
+        df_merged: DataFrame with merged transcript segments
+
+    Returns:
+        bool: True if simple_segmentation should be used instead
+    """
+    return (len(df_merged) < GEMINI_MIN_ROWS
+            or df_merged['text'].str.len().sum() < GEMINI_MIN_CHARS)
+
+
+def stream_gemini_segments(df_merged: pd.DataFrame, api_key: str = None) -> Generator[Tuple[str, List[str]], None, None]:
+    """
+    Stream topic segments from Gemini as soon as each one is complete.
+
+    Short transcripts (see GEMINI_MIN_ROWS / GEMINI_MIN_CHARS) are segmented
+    locally with simple_segmentation without calling Gemini.
+
+    Long transcripts are split into overlapping windows of WINDOW_ROWS rows
+    that are segmented concurrently; topics at window boundaries are merged
+    when their wording is similar.
+
+    Args:
+        df_merged: DataFrame with merged transcript segments
+        api_key: Google AI API key (or use GEMINI_API_KEY from .env file)
+
+    Yields:
+        tuple: (title, sentences) for each completed segment
+
+    Raises:
+        Exception: If the API call fails or the response has no segments
+    """
+    # Very short transcript: no Gemini round trip
+    if _is_short_transcript(df_merged):
+        logger.info("   ⚡ Short transcript: using simple segmentation")
+        paragraphs, topic_titles = simple_segmentation(df_merged)
+        yield from zip(topic_titles, paragraphs)
+        return
+
+    texts = df_merged['text']
+
+    # Single streamed request
+    if len(texts) <= WINDOW_ROWS:
+        full_text = texts.str.cat(sep=' ')
+        for segment in _stream_text_segments(full_text, api_key):
+            yield _segment_to_paragraph(segment)
+        return
+
+    # Long transcript: overlapping windows, segmented in parallel
+    step = WINDOW_ROWS - WINDOW_OVERLAP_ROWS
+    starts = range(0, len(texts) - WINDOW_OVERLAP_ROWS, step)
+    windows = [texts.iloc[start:start + WINDOW_ROWS].str.cat(sep=' ') for start in starts]
+    overlap_words = [
+        len(texts.iloc[start:start + WINDOW_OVERLAP_ROWS].str.cat(sep=' ').split())
+        for start in starts
+    ]
+    logger.info("   🪟 Long transcript: %d windows in parallel", len(windows))
+
+    with ThreadPoolExecutor(max_workers=len(windows)) as pool:
+        futures = [pool.submit(_segment_window, window, api_key) for window in windows]
+
+        # Yield in window order; the last topic of a window is held back
+        # until the next window shows whether it continues there
+        pending = None
+        prev_words = []
+        for i, future in enumerate(futures):
+            paragraphs = future.result()
+
+            # Trim the words this window repeats from the end of the previous one
+            words = _paragraph_words(paragraphs)
+            if i > 0:
+                paragraphs = _drop_leading_words(
+                    paragraphs, _overlap_length(prev_words, words, overlap_words[i])
+                )
+            prev_words = words
+            if not paragraphs:
+                continue
+
+            if pending is not None:
+                title, sentences = paragraphs[0]
+                if _jaccard(pending[1], sentences) >= BOUNDARY_MERGE_JACCARD:
+                    paragraphs[0] = (pending[0], pending[1] + sentences)
+                else:
+                    yield pending
+
+            yield from paragraphs[:-1]
+            pending = paragraphs[-1]
+
+        if pending is not None:
+            yield pending
+
+
+def segment_with_gemini(df_merged: pd.DataFrame, api_key: str = None) -> Tuple[List[List[str]], List[str]]:
+    """
+    Segment transcript into semantic paragraphs using Gemini LLM.
+
+    Args:
+        df_merged: DataFrame with merged transcript segments
+        api_key: Google AI API key (or use GEMINI_API_KEY from .env file)
+
+    Returns:
+        tuple: (paragraphs, topic_titles)
+            - paragraphs: List of paragraphs (each is a list of sentences)
+            - topic_titles: List of topic titles for each paragraph
+    """
+    try:
+        paragraphs = []
+        topic_titles = []
+
+        for title, sentences in stream_gemini_segments(df_merged, api_key=api_key):
             paragraphs.append(sentences)
             topic_titles.append(title)
 
-        print(f"   ✅ Gemini segmentation: {len(paragraphs)} topics")
+        logger.info("   ✅ Gemini segmentation: %d topics", len(paragraphs))
         return paragraphs, topic_titles
 
     except Exception as e:
-        print(f"   ⚠️  Gemini segmentation failed: {e}")
-        print(f"   ℹ️  Falling back to simple segmentation...")
+        logger.warning("   ⚠️  Gemini segmentation failed: %s", e)
+        logger.warning("   ℹ️  Falling back to simple segmentation...")
 
         # Fallback: simple segmentation by length
         return simple_segmentation(df_merged)
@@ -153,22 +587,13 @@ def simple_segmentation(df_merged: pd.DataFrame) -> Tuple[List[List[str]], List[
     Returns:
         tuple: (paragraphs, topic_titles)
     """
-    sentences = df_merged['text'].tolist()
+    sentences = df_merged['text'].to_numpy(dtype=object)
 
-    # Split into ~10 segments
+    # Split into ~10 balanced segments
     num_segments = min(10, max(5, len(sentences) // 10))
-    chunk_size = len(sentences) // num_segments
-
-    paragraphs = []
-    topic_titles = []
-
-    for i in range(num_segments):
-        start_idx = i * chunk_size
-        end_idx = start_idx + chunk_size if i < num_segments - 1 else len(sentences)
+    chunks = np.array_split(sentences, num_segments)
 
-        chunk = sentences[start_idx:end_idx]
-        if chunk:
-            paragraphs.append(chunk)
-            topic_titles.append(f"Topic {i+1}")
+    paragraphs = [chunk.tolist() for chunk in chunks if len(chunk)]
+    topic_titles = [f"Topic {i+1}" for i in range(len(paragraphs))]
 
     return paragraphs, topic_titles
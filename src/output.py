@@ -10,12 +10,27 @@ This module handles:
 """
 
 import os
+import hashlib
+import codecs
 import re
-import json
+import orjson
 import pandas as pd
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
+from .cache import atomic_write
+
+# Characters not allowed in file names
+_INVALID_FN_RE = re.compile(r'[<>:"/\\|?*]')
+# Sentence-ending punctuation (kept as separate items by split)
+_SENT_SPLIT_RE = re.compile(r'([.!?]+)')
+
+
+def _now() -> str:
+    """Current local time as written in output headers."""
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
 
 def sanitize_filename(title: str) -> str:
     """
@@ -25,28 +40,102 @@ def sanitize_filename(title: str) -> str:
         title: Video title
 
     Returns:
-        str: Sanitized filename (max 100 chars)
+        str: Sanitized filename (max 93 chars: up to 80 title chars + "_" + 12-char hash)
     """
     # Remove invalid filename characters
-    title = re.sub(r'[<>:"/\\|?*]', '', title)
+    title = _INVALID_FN_RE.sub('', title)
     # Replace spaces with underscores
     title = title.replace(' ', '_')
-    # Limit length
-    return title[:100]
+    # Limit length; the hash of the full title keeps long titles with the
+    # same prefix from sharing a folder
+    digest = hashlib.blake2b(title.encode('utf-8'), digest_size=6).hexdigest()
+    return f"{title[:80]}_{digest}"
 
 
 def save_csv(df_merged: pd.DataFrame, output_path: str):
     """
-    Save merged segments as CSV.
+    Save merged segments as CSV (with PyArrow if installed, else pandas).
 
     Args:
         df_merged: DataFrame with merged segments
         output_path: Path to save CSV file
     """
-    df_merged.to_csv(output_path, index=False, encoding="utf-8-sig")
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        atomic_write(output_path, df_merged.to_csv(index=False).encode('utf-8-sig'))
+        return
+
+    # PyArrow serializes in C; the BOM keeps the file Excel-friendly like utf-8-sig
+    table = pa.Table.from_pandas(df_merged, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    pacsv.write_csv(table, sink)
+    atomic_write(output_path, codecs.BOM_UTF8 + sink.getvalue().to_pybytes())
+
+
+def format_txt_basic(df_merged: pd.DataFrame, video_info: dict, max_line_length: int = 100,
+                     processed_time: str = None) -> str:
+    """
+    Render the plain transcript, with sentences split by similar length, as text.
 
+    Args:
+        df_merged: DataFrame with merged segments
+        video_info: Video metadata
+        max_line_length: Target maximum characters per line (default: 100)
+        processed_time: Header timestamp (default: now)
 
-def save_txt_basic(df_merged: pd.DataFrame, output_path: str, video_info: dict, max_line_length: int = 100):
+    Returns:
+        str: Rendered transcript (same layout as the TXT file)
+    """
+    # Header
+    parts = [
+        f"Video: {video_info['title']}\n",
+        f"URL: {video_info['url']}\n",
+        f"Processed: {processed_time or _now()}\n",
+        f"Segments: {len(df_merged)}\n",
+        "=" * 80 + "\n\n",
+    ]
+
+    # Collect all text from segments
+    all_text = ' '.join(df_merged['text'].tolist())
+
+    # Split into sentences, rebuilding each with its punctuation
+    # (split alternates text pieces and punctuation runs)
+    pieces = _SENT_SPLIT_RE.split(all_text)
+    sentences = [text.strip() + punct for text, punct in zip(pieces[0::2], pieces[1::2])]
+
+    # Handle last part if no punctuation
+    if len(pieces) % 2 == 1:
+        sentences.append(pieces[-1].strip())
+
+    # Combine sentences into lines with similar length
+    line = []
+    line_length = 0
+    for sentence in sentences:
+        if not sentence:
+            continue
+
+        # If adding this sentence exceeds max length and we have content, emit the line
+        if line and line_length + len(sentence) + 1 > max_line_length:
+            parts.append(' '.join(line))
+            parts.append('\n')
+            line = [sentence]
+            line_length = len(sentence) + 1
+        else:
+            line.append(sentence)
+            line_length += len(sentence) + 1
+
+    # Remaining content
+    if line:
+        parts.append(' '.join(line))
+        parts.append('\n')
+
+    return ''.join(parts)
+
+
+def save_txt_basic(df_merged: pd.DataFrame, output_path: str, video_info: dict, max_line_length: int = 100,
+                   processed_time: str = None):
     """
     Save transcript as plain text with sentences split by similar length.
 
@@ -55,54 +144,54 @@ def save_txt_basic(df_merged: pd.DataFrame, output_path: str, video_info: dict,
         output_path: Path to save TXT file
         video_info: Video metadata
         max_line_length: Target maximum characters per line (default: 100)
+        processed_time: Header timestamp (default: now)
+    """
+    atomic_write(output_path, format_txt_basic(df_merged, video_info, max_line_length=max_line_length,
+                                                processed_time=processed_time))
+
+
+def format_txt_semantic_with_titles(paragraphs: List[List[str]], video_info: dict, titles: List[str] = None,
+                                    processed_time: str = None, joined_paragraphs: List[str] = None) -> str:
+    """
+    Render semantic paragraphs with topic titles as text.
+
+    Args:
+        paragraphs: List of paragraphs (each paragraph is a list of sentences)
+        video_info: Video metadata
+        titles: Optional list of topic titles for each paragraph
+        processed_time: Header timestamp (default: now)
+        joined_paragraphs: Optional paragraphs already joined into text
+
+    Returns:
+        str: Rendered transcript (same layout as the TXT file)
     """
-    with open(output_path, 'w', encoding='utf-8') as f:
-        # Write header
-        f.write(f"Video: {video_info['title']}\n")
-        f.write(f"URL: {video_info['url']}\n")
-        f.write(f"Processed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Segments: {len(df_merged)}\n")
-        f.write("=" * 80 + "\n\n")
-
-        # Collect all text from segments
-        all_text = ' '.join(df_merged['text'].tolist())
-
-        # Split into sentences
-        sentences = re.split(r'([.!?]+)', all_text)
-
-        # Rebuild sentences with punctuation
-        full_sentences = []
-        for i in range(0, len(sentences) - 1, 2):
-            sentence = sentences[i].strip()
-            if i + 1 < len(sentences):
-                sentence += sentences[i + 1]
-            if sentence:
-                full_sentences.append(sentence)
-
-        # Handle last part if no punctuation
-        if len(sentences) % 2 == 1 and sentences[-1].strip():
-            full_sentences.append(sentences[-1].strip())
-
-        # Combine sentences into lines with similar length
-        current_line = ""
-        for sentence in full_sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-
-            # If adding this sentence exceeds max length and we have content, write the line
-            if current_line and len(current_line) + len(sentence) + 1 > max_line_length:
-                f.write(current_line.strip() + '\n')
-                current_line = sentence + ' '
-            else:
-                current_line += sentence + ' '
-
-        # Write remaining content
-        if current_line.strip():
-            f.write(current_line.strip() + '\n')
-
-
-def save_txt_semantic_with_titles(paragraphs: List[List[str]], output_path: str, video_info: dict, titles: List[str] = None):
+    # Header
+    parts = [
+        f"Video: {video_info['title']}\n",
+        f"URL: {video_info['url']}\n",
+        f"Processed: {processed_time or _now()}\n",
+        f"Paragraphs: {len(paragraphs)}\n",
+        "=" * 80 + "\n\n",
+    ]
+
+    # Join sentences in each paragraph with space (unless already joined)
+    if joined_paragraphs is None:
+        joined_paragraphs = [' '.join(paragraph) for paragraph in paragraphs]
+
+    # Each paragraph with title
+    for i, paragraph_text in enumerate(joined_paragraphs):
+        # Title if available
+        if titles and i < len(titles):
+            parts.append(f"### {titles[i]}\n\n")
+
+        parts.append(paragraph_text)
+        parts.append('\n\n')
+
+    return ''.join(parts)
+
+
+def save_txt_semantic_with_titles(paragraphs: List[List[str]], output_path: str, video_info: dict, titles: List[str] = None,
+                                  processed_time: str = None, joined_paragraphs: List[str] = None):
     """
     Save transcript as text with semantic paragraph segmentation and topic titles.
 
@@ -111,27 +200,16 @@ def save_txt_semantic_with_titles(paragraphs: List[List[str]], output_path: str,
         output_path: Path to save TXT file
         video_info: Video metadata
         titles: Optional list of topic titles for each paragraph
+        processed_time: Header timestamp (default: now)
+        joined_paragraphs: Optional paragraphs already joined into text
     """
-    with open(output_path, 'w', encoding='utf-8') as f:
-        # Write header
-        f.write(f"Video: {video_info['title']}\n")
-        f.write(f"URL: {video_info['url']}\n")
-        f.write(f"Processed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Paragraphs: {len(paragraphs)}\n")
-        f.write("=" * 80 + "\n\n")
+    atomic_write(output_path, format_txt_semantic_with_titles(paragraphs, video_info, titles=titles,
+                                                               processed_time=processed_time,
+                                                               joined_paragraphs=joined_paragraphs))
 
-        # Write each paragraph with title
-        for i, paragraph in enumerate(paragraphs):
-            # Write title if available
-            if titles and i < len(titles):
-                f.write(f"### {titles[i]}\n\n")
-            
-            # Join sentences in paragraph with space
-            paragraph_text = ' '.join(paragraph)
-            f.write(paragraph_text + '\n\n')
 
-
-def save_txt_semantic_plain(paragraphs: List[List[str]], output_path: str, video_info: dict):
+def save_txt_semantic_plain(paragraphs: List[List[str]], output_path: str, video_info: dict,
+                            processed_time: str = None, joined_paragraphs: List[str] = None):
     """
     Save transcript as plain text with paragraph breaks only (no titles).
 
@@ -139,22 +217,31 @@ def save_txt_semantic_plain(paragraphs: List[List[str]], output_path: str, video
         paragraphs: List of paragraphs (each paragraph is a list of sentences)
         output_path: Path to save TXT file
         video_info: Video metadata
+        processed_time: Header timestamp (default: now)
+        joined_paragraphs: Optional paragraphs already joined into text
     """
-    with open(output_path, 'w', encoding='utf-8') as f:
-        # Write header
-        f.write(f"Video: {video_info['title']}\n")
-        f.write(f"URL: {video_info['url']}\n")
-        f.write(f"Processed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Paragraphs: {len(paragraphs)}\n")
-        f.write("=" * 80 + "\n\n")
+    # Header
+    parts = [
+        f"Video: {video_info['title']}\n",
+        f"URL: {video_info['url']}\n",
+        f"Processed: {processed_time or _now()}\n",
+        f"Paragraphs: {len(paragraphs)}\n",
+        "=" * 80 + "\n\n",
+    ]
+
+    if joined_paragraphs is None:
+        joined_paragraphs = [' '.join(paragraph) for paragraph in paragraphs]
 
-        # Write each paragraph with just line breaks
-        for paragraph in paragraphs:
-            paragraph_text = ' '.join(paragraph)
-            f.write(paragraph_text + '\n\n')
+    # Each paragraph with just line breaks
+    for paragraph_text in joined_paragraphs:
+        parts.append(paragraph_text)
+        parts.append('\n\n')
 
+    atomic_write(output_path, ''.join(parts))
 
-def save_json_semantic(paragraphs: List[List[str]], output_path: str, video_info: dict, titles: List[str] = None):
+
+def save_json_semantic(paragraphs: List[List[str]], output_path: str, video_info: dict, titles: List[str] = None,
+                       processed_time: str = None, joined_paragraphs: List[str] = None):
     """
     Save transcript as JSON with semantic paragraphs and titles.
 
@@ -163,14 +250,19 @@ def save_json_semantic(paragraphs: List[List[str]], output_path: str, video_info
         output_path: Path to save JSON file
         video_info: Video metadata
         titles: Optional list of topic titles for each paragraph
+        processed_time: Header timestamp (default: now)
+        joined_paragraphs: Optional paragraphs already joined into text
     """
+    if joined_paragraphs is None:
+        joined_paragraphs = [' '.join(paragraph) for paragraph in paragraphs]
+
     # Build sections
     sections = []
-    for i, paragraph in enumerate(paragraphs):
+    for i, (paragraph, paragraph_text) in enumerate(zip(paragraphs, joined_paragraphs)):
         section = {
             "title": titles[i] if titles and i < len(titles) else f"Topic {i+1}",
             "sentences": paragraph,
-            "text": ' '.join(paragraph)
+            "text": paragraph_text
         }
         sections.append(section)
     
@@ -180,27 +272,28 @@ def save_json_semantic(paragraphs: List[List[str]], output_path: str, video_info
             "title": video_info['title'],
             "url": video_info['url'],
             "video_id": video_info.get('id', ''),
-            "processed_time": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "processed_time": processed_time or _now(),
             "num_sections": len(sections)
         },
         "sections": sections
     }
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    # UTF-8 JSON indented for readability, serialized in C and written with a single call
+    atomic_write(output_path, orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
 
 
 def save_all_outputs(df_merged: pd.DataFrame,
                     video_info: dict,
                     output_dir: str,
                     semantic_paragraphs: List[List[str]] = None,
-                    topic_titles: List[str] = None) -> dict:
+                    topic_titles: List[str] = None,
+                    processed_time: str = None) -> dict:
     """
     Save all output files (CSV, TXT with titles, TXT plain, JSON).
 
     Creates a dedicated folder for each video to organize outputs:
     data/
-    └── Video_Title/
+    └── Video_Title_1a2b3c4d5e6f/
         ├── transcript.csv        # Raw transcript with timestamps
         ├── transcript.txt        # Semantic paragraphs with topic titles
         ├── transcript_plain.txt  # Semantic paragraphs (line breaks only)
@@ -212,6 +305,7 @@ def save_all_outputs(df_merged: pd.DataFrame,
         output_dir: Base directory to save files
         semantic_paragraphs: Optional semantic paragraph segmentation
         topic_titles: Optional list of topic titles
+        processed_time: Timestamp shared by all file headers (default: now)
 
     Returns:
         dict: Paths to created files
@@ -221,33 +315,46 @@ def save_all_outputs(df_merged: pd.DataFrame,
     video_folder = os.path.join(output_dir, safe_title)
     os.makedirs(video_folder, exist_ok=True)
 
-    paths = {}
-
-    # Save CSV (always)
-    csv_path = os.path.join(video_folder, "transcript.csv")
-    save_csv(df_merged, csv_path)
-    paths['csv'] = csv_path
-
-    # Save TXT files
-    if semantic_paragraphs:
-        # With titles
-        txt_path = os.path.join(video_folder, "transcript.txt")
-        save_txt_semantic_with_titles(semantic_paragraphs, txt_path, video_info, titles=topic_titles)
-        paths['txt'] = txt_path
-        
-        # Plain (no titles, just line breaks)
-        txt_plain_path = os.path.join(video_folder, "transcript_plain.txt")
-        save_txt_semantic_plain(semantic_paragraphs, txt_plain_path, video_info)
-        paths['txt_plain'] = txt_plain_path
-    else:
-        txt_path = os.path.join(video_folder, "transcript.txt")
-        save_txt_basic(df_merged, txt_path, video_info)
-        paths['txt'] = txt_path
-
-    # Save JSON (if semantic paragraphs available)
-    if semantic_paragraphs:
-        json_path = os.path.join(video_folder, "transcript.json")
-        save_json_semantic(semantic_paragraphs, json_path, video_info, titles=topic_titles)
-        paths['json'] = json_path
+    paths = {
+        'csv': os.path.join(video_folder, "transcript.csv"),
+        'txt': os.path.join(video_folder, "transcript.txt"),
+    }
+
+    # One timestamp for every file
+    processed_time = processed_time or _now()
+
+    # The writers are independent and I/O bound: run them concurrently
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        # Save CSV (always)
+        futures = [pool.submit(save_csv, df_merged, paths['csv'])]
+
+        # Save TXT files
+        if semantic_paragraphs:
+            # Paragraph text shared by the TXT and JSON writers
+            joined_paragraphs = [' '.join(paragraph) for paragraph in semantic_paragraphs]
+
+            paths['txt_plain'] = os.path.join(video_folder, "transcript_plain.txt")
+            paths['json'] = os.path.join(video_folder, "transcript.json")
+
+            # With titles
+            futures.append(pool.submit(save_txt_semantic_with_titles, semantic_paragraphs, paths['txt'], video_info,
+                                       titles=topic_titles, processed_time=processed_time,
+                                       joined_paragraphs=joined_paragraphs))
+
+            # Plain (no titles, just line breaks)
+            futures.append(pool.submit(save_txt_semantic_plain, semantic_paragraphs, paths['txt_plain'], video_info,
+                                       processed_time=processed_time, joined_paragraphs=joined_paragraphs))
+
+            # Save JSON (if semantic paragraphs available)
+            futures.append(pool.submit(save_json_semantic, semantic_paragraphs, paths['json'], video_info,
+                                       titles=topic_titles, processed_time=processed_time,
+                                       joined_paragraphs=joined_paragraphs))
+        else:
+            futures.append(pool.submit(save_txt_basic, df_merged, paths['txt'], video_info,
+                                       processed_time=processed_time))
+
+    # Re-raise the first writer error, if any
+    for future in futures:
+        future.result()
 
     return paths
@@ -7,14 +7,81 @@ This module contains the main processing logic that coordinates
 all extraction steps.
 """
 
-import os
+import queue
+import logging
+import threading
 from datetime import datetime
-from typing import Generator, Tuple, Dict
+from typing import Generator, Iterator, Optional, Tuple, Dict
 
-from .download import extract_video_info, download_subtitles
-from .preprocessing import parse_vtt_file, merge_by_time_window
-from .llm_segmentation import segment_with_gemini
-from .output import save_all_outputs
+from .download import get_video_info_and_subs
+from .preprocessing import VttStreamParser, merge_by_time_window
+from .llm_segmentation import segment_with_gemini, stream_gemini_segments, simple_segmentation
+from .output import save_all_outputs, format_txt_basic, format_txt_semantic_with_titles
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a background stream
+_STREAM_END = object()
+
+
+class _BackgroundStream:
+    """
+    Iterator over items consumed on a background thread.
+
+    close() (also called when the consumer stops early) tells the producer
+    to stop between items and close the source iterator, releasing e.g. an
+    open Gemini stream and its concurrency slot.
+    """
+
+    def __init__(self, items: Iterator):
+        self._buffer = queue.Queue()
+        self._stop = threading.Event()
+        threading.Thread(target=self._produce, args=(items,), name="semantic", daemon=True).start()
+
+    def _produce(self, items: Iterator):
+        try:
+            for item in items:
+                if self._stop.is_set():
+                    break
+                self._buffer.put((item, None))
+            self._buffer.put((_STREAM_END, None))
+        except Exception as e:
+            self._buffer.put((_STREAM_END, e))
+        finally:
+            # Closed on this thread: a running generator cannot be closed from another
+            close = getattr(items, 'close', None)
+            if close is not None:
+                close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item, error = self._buffer.get()
+        if item is _STREAM_END:
+            # Keep reporting the end on further calls
+            self._buffer.put((item, None))
+            if error is not None:
+                raise error
+            raise StopIteration
+        return item
+
+    def close(self):
+        self._stop.set()
+
+
+def _stream_in_background(items: Iterator) -> _BackgroundStream:
+    """
+    Start consuming an iterator on a background thread right away.
+
+    Args:
+        items: Iterator to consume (e.g. a generator of streamed results)
+
+    Returns:
+        _BackgroundStream: Yields the items as they arrive; re-raises the producer's
+        error. Close it when stopping early so the producer stops too.
+    """
+    return _BackgroundStream(items)
 
 
 def process_video(video_url: str,
@@ -43,22 +110,15 @@ def process_video(video_url: str,
     print(title)
     print("=" * 80)
 
-    # Create temp directory
-    temp_dir = os.path.join(output_dir, "temp")
-    os.makedirs(temp_dir, exist_ok=True)
-
     try:
-        # Step 1: Extract video info
+        # Step 1-3: Extract video info, download subtitles (kept in memory)
+        # and parse them while they arrive
         print()
-        video_info = extract_video_info(video_url)
+        parser = VttStreamParser()
+        video_info, _ = get_video_info_and_subs(video_url, on_chunk=parser.feed)
 
-        # Step 2: Download subtitles
         print()
-        vtt_path = download_subtitles(video_url, video_info['id'], temp_dir)
-
-        # Step 3: Parse and preprocess
-        print()
-        df = parse_vtt_file(vtt_path)
+        df = parser.close()
 
         if df.empty:
             raise Exception("No valid subtitle content found")
@@ -89,8 +149,8 @@ def process_video(video_url: str,
             topic_titles=topic_titles
         )
 
-        # Calculate stats
-        total_words = sum(len(text.split()) for text in df_merged['text'].tolist())
+        # Calculate stats (merged text is single-space separated: words = spaces + 1)
+        total_words = int(df_merged['text'].str.count(' ').sum()) + len(df_merged)
 
         # Print summary
         print()
@@ -107,21 +167,6 @@ def process_video(video_url: str,
             stats += f", {len(semantic_paragraphs)} paragraphs"
         print(stats)
 
-        # Cleanup temp files and folder
-        print()
-        print("🗑️  Cleaning up temporary files...")
-        try:
-            # Remove VTT file
-            if os.path.exists(vtt_path):
-                os.remove(vtt_path)
-            # Remove entire temp directory
-            import shutil
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
-            print("   ✅ Temporary files cleaned")
-        except Exception as e:
-            print(f"   ⚠️  Cleanup warning: {e}")
-
         print()
         print("=" * 80)
         print("✨ Done!")
@@ -135,43 +180,36 @@ def process_video(video_url: str,
 
 
 def process_video_progressive(video_url: str,
-                              output_dir: str = "data/quick_start",
+                              output_dir: Optional[str] = "data/quick_start",
                               window_seconds: int = 25) -> Generator[Tuple[str, Dict], None, None]:
     """
     Progressive video transcript extraction pipeline.
 
-    Yields results in two stages:
+    Yields results in stages:
     1. Basic transcript (immediate)
-    2. Semantic segmentation (advanced processing)
+    2. Partial semantic segmentation (once per topic streamed from Gemini)
+    3. Semantic segmentation (advanced processing)
 
     Args:
         video_url: YouTube video URL
-        output_dir: Directory to save output files
+        output_dir: Directory to save output files (None: keep everything in memory)
         window_seconds: Time window for merging segments (default: 25s)
 
     Yields:
         tuple: (stage, data)
-            - stage: "basic" or "semantic"
-            - data: dict with file paths and content
+            - stage: "basic", "semantic_partial" or "semantic"
+            - data: dict with file paths (empty without output_dir) and content
 
     Raises:
         Exception: If any step fails
     """
-    import shutil
-
-    # Create temp directory
-    temp_dir = os.path.join(output_dir, "temp")
-    os.makedirs(temp_dir, exist_ok=True)
-
+    semantic_stream = None
     try:
-        # Step 1: Extract video info
-        video_info = extract_video_info(video_url)
-
-        # Step 2: Download subtitles
-        vtt_path = download_subtitles(video_url, video_info['id'], temp_dir)
-
-        # Step 3: Parse and preprocess
-        df = parse_vtt_file(vtt_path)
+        # Step 1-3: Extract video info, download subtitles (kept in memory)
+        # and parse them while they arrive
+        parser = VttStreamParser()
+        video_info, _ = get_video_info_and_subs(video_url, on_chunk=parser.feed)
+        df = parser.close()
 
         if df.empty:
             raise Exception("No valid subtitle content found")
@@ -182,21 +220,26 @@ def process_video_progressive(video_url: str,
         if df_merged.empty:
             raise Exception("No data after merging")
 
-        # Step 5: Save basic output (WITHOUT semantic segmentation)
-        # This happens FAST
-        basic_paths = save_all_outputs(
-            df_merged=df_merged,
-            video_info=video_info,
-            output_dir=output_dir,
-            semantic_paragraphs=None,  # No semantic yet
-            topic_titles=None
-        )
+        # Start semantic segmentation now so it overlaps with the basic
+        # output and with the consumer handling the first stage
+        semantic_stream = _stream_in_background(stream_gemini_segments(df_merged))
 
-        # Read basic plain text
-        basic_content = ""
-        if basic_paths.get('txt') and os.path.exists(basic_paths['txt']):
-            with open(basic_paths['txt'], 'r', encoding='utf-8') as f:
-                basic_content = f.read()
+        # Step 5: Basic output (WITHOUT semantic segmentation)
+        # This happens FAST
+        processed_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        basic_paths = {}
+        if output_dir:
+            basic_paths = save_all_outputs(
+                df_merged=df_merged,
+                video_info=video_info,
+                output_dir=output_dir,
+                semantic_paragraphs=None,  # No semantic yet
+                topic_titles=None,
+                processed_time=processed_time
+            )
+
+        # Render basic plain text in memory
+        basic_content = format_txt_basic(df_merged, video_info, processed_time=processed_time)
 
         # Yield stage 1: Basic transcript (IMMEDIATE)
         yield ("basic", {
@@ -206,23 +249,44 @@ def process_video_progressive(video_url: str,
         })
 
         # Step 6: Semantic paragraph segmentation (SLOW - Advanced processing)
-        semantic_paragraphs, topic_titles = segment_with_gemini(df_merged)
-
-        # Step 7: Save semantic output
-        semantic_paths = save_all_outputs(
-            df_merged=df_merged,
-            video_info=video_info,
-            output_dir=output_dir,
-            semantic_paragraphs=semantic_paragraphs,
-            topic_titles=topic_titles
+        # Topics are streamed as Gemini produces them
+        semantic_paragraphs = []
+        topic_titles = []
+        try:
+            for title, sentences in semantic_stream:
+                semantic_paragraphs.append(sentences)
+                topic_titles.append(title)
+
+                # Yield partial stage: topics completed so far
+                yield ("semantic_partial", {
+                    "content": format_txt_semantic_with_titles(
+                        semantic_paragraphs, video_info, titles=topic_titles
+                    ),
+                    "video_info": video_info
+                })
+        except Exception as e:
+            logger.warning("   ⚠️  Gemini segmentation failed: %s", e)
+            logger.warning("   ℹ️  Falling back to simple segmentation...")
+            semantic_paragraphs, topic_titles = simple_segmentation(df_merged)
+
+        # Step 7: Semantic output
+        processed_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        semantic_paths = {}
+        if output_dir:
+            semantic_paths = save_all_outputs(
+                df_merged=df_merged,
+                video_info=video_info,
+                output_dir=output_dir,
+                semantic_paragraphs=semantic_paragraphs,
+                topic_titles=topic_titles,
+                processed_time=processed_time
+            )
+
+        # Render semantic content in memory
+        semantic_content = format_txt_semantic_with_titles(
+            semantic_paragraphs, video_info, titles=topic_titles, processed_time=processed_time
         )
 
-        # Read semantic content
-        semantic_content = ""
-        if semantic_paths.get('txt') and os.path.exists(semantic_paths['txt']):
-            with open(semantic_paths['txt'], 'r', encoding='utf-8') as f:
-                semantic_content = f.read()
-
         # Yield stage 2: Semantic segmentation (DELAYED)
         yield ("semantic", {
             "paths": semantic_paths,
@@ -230,14 +294,9 @@ def process_video_progressive(video_url: str,
             "video_info": video_info
         })
 
-        # Cleanup temp files and folder
-        try:
-            if os.path.exists(vtt_path):
-                os.remove(vtt_path)
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
-        except Exception as e:
-            print(f"Cleanup warning: {e}")
-
     except Exception as e:
         raise
+    finally:
+        # Stop the background segmentation if the consumer stopped early
+        if semantic_stream is not None:
+            semantic_stream.close()
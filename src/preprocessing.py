@@ -10,9 +10,16 @@ This module handles:
 """
 
 import re
-import webvtt
+import codecs
+from collections import deque
+from itertools import islice
+import numpy as np
 import pandas as pd
 
+# Bracketed annotations, e.g. [Music], [Applause]
+_BRACKET_RE = re.compile(r'\[.*?\]')
+_WS_RE = re.compile(r'\s+')
+
 
 def timestamp_to_seconds(timestamp: str) -> float:
     """
@@ -41,11 +48,130 @@ def clean_text(text: str) -> str:
     Returns:
         str: Cleaned text
     """
-    # Remove [Music], [Applause], etc.
-    text = re.sub(r'\[.*?\]', '', text)
-    # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    # Remove [Music], [Applause], etc. and normalize whitespace
+    return _WS_RE.sub(' ', _BRACKET_RE.sub('', text)).strip()
+
+
+# Cue timing line, e.g. "00:01:02.500 --> 00:01:05.000 align:start" (hours optional),
+# captured as (hours, minutes, seconds) for start and end
+_TIMING_RE = re.compile(
+    r'(?:(\d+):)?(\d{2}):(\d{2}\.\d{3})\s+-->\s+(?:(\d+):)?(\d{2}):(\d{2}\.\d{3})'
+)
+# Inline cue tags, e.g. <c>, </c>, <00:00:01.200>
+_CUE_TAG_RE = re.compile(r'<[^>]*>')
+
+
+class VttStreamParser:
+    """
+    Incremental WebVTT parser.
+
+    Bytes can be fed as they arrive from the network; every complete cue block
+    (blocks are separated by blank lines) is parsed right away, so parsing
+    overlaps with the download.
+
+    Usage:
+        parser = VttStreamParser()
+        for chunk in chunks:
+            parser.feed(chunk)
+        df = parser.close()
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+        self._pending = ""
+        # One list per column (start, end, start_sec, end_sec, text)
+        self._starts = []
+        self._ends = []
+        self._start_secs = []
+        self._end_secs = []
+        self._texts = []
+
+    def feed(self, data: bytes):
+        """
+        Parse the complete cue blocks contained in the next chunk of VTT bytes.
+
+        Args:
+            data: Next chunk of the VTT file
+        """
+        text = (self._pending + self._decoder.decode(data)).replace('\r\n', '\n')
+        blocks = text.split('\n\n')
+        # The last block may still be incomplete
+        self._pending = blocks.pop()
+        for block in blocks:
+            self._parse_block(block)
+
+    def close(self) -> pd.DataFrame:
+        """
+        Parse any remaining data and build the DataFrame.
+
+        Returns:
+            DataFrame: Parsed subtitles with columns (start, end, start_sec, end_sec, text)
+        """
+        print(f"🔧 Processing subtitles...")
+        tail = self._pending + self._decoder.decode(b'', final=True)
+        self._pending = ""
+        self._parse_block(tail.replace('\r\n', '\n'))
+
+        # Categorical timestamp labels (cues repeat each boundary); seconds stay
+        # float64, since float32 cannot hold milliseconds past ~4.5 h (16384 s)
+        df = pd.DataFrame({
+            "start": pd.Categorical(self._starts),
+            "end": pd.Categorical(self._ends),
+            "start_sec": np.array(self._start_secs, dtype=np.float64),
+            "end_sec": np.array(self._end_secs, dtype=np.float64),
+            "text": self._texts
+        })
+        if not df.empty:
+            print(f"   📄 Original lines: {len(df)}")
+        return df
+
+    def _parse_block(self, block: str):
+        """
+        Parse one block of lines (header, NOTE and STYLE blocks are skipped).
+
+        Whitespace-only lines end a cue too, as in webvtt-py: YouTube
+        auto-captions open each caption burst with a cue whose first text
+        line is " ", which leaves that cue without text (it is dropped).
+
+        Args:
+            block: Text of the block without surrounding blank lines
+        """
+        cue = []
+        for line in block.split('\n'):
+            if line.strip():
+                cue.append(line)
+            elif cue:
+                self._parse_cue(cue)
+                cue = []
+        if cue:
+            self._parse_cue(cue)
+
+    def _parse_cue(self, lines: list):
+        """
+        Parse one cue: timing line first, or second after a cue identifier,
+        followed by at least one text line.
+
+        Args:
+            lines: Non-blank lines of the cue
+        """
+        for i in (0, 1):
+            if len(lines) < i + 2 or '-->' in lines[i + 1] or (i and '-->' in lines[0]):
+                continue
+            match = _TIMING_RE.match(lines[i])
+            if not match:
+                continue
+
+            text = _CUE_TAG_RE.sub('', '\n'.join(lines[i + 1:])).strip().replace('\n', ' ')
+            if len(text.split()) >= 2:  # Only keep lines with 2+ words
+                start_h, start_m, start_s, end_h, end_m, end_s = match.groups()
+                start_h = start_h or '00'
+                end_h = end_h or '00'
+                self._starts.append(f"{start_h}:{start_m}:{start_s}")
+                self._ends.append(f"{end_h}:{end_m}:{end_s}")
+                self._start_secs.append(int(start_h) * 3600 + int(start_m) * 60 + float(start_s))
+                self._end_secs.append(int(end_h) * 3600 + int(end_m) * 60 + float(end_s))
+                self._texts.append(text)
+            return
 
 
 def parse_vtt_file(vtt_path: str) -> pd.DataFrame:
@@ -58,46 +184,102 @@ def parse_vtt_file(vtt_path: str) -> pd.DataFrame:
     Returns:
         DataFrame: Parsed subtitles with columns (start, end, start_sec, end_sec, text)
     """
-    print(f"🔧 Processing subtitles...")
-    records = []
+    with open(vtt_path, 'rb') as f:
+        return parse_vtt_bytes(f.read())
+
+
+def parse_vtt_string(content: str) -> pd.DataFrame:
+    """
+    Parse VTT subtitle content held in memory into DataFrame.
+
+    Args:
+        content: VTT file content
+
+    Returns:
+        DataFrame: Parsed subtitles with columns (start, end, start_sec, end_sec, text)
+    """
+    return parse_vtt_bytes(content.encode('utf-8'))
+
+
+def parse_vtt_bytes(data: bytes) -> pd.DataFrame:
+    """
+    Parse raw VTT bytes (as downloaded) into DataFrame.
+
+    Args:
+        data: UTF-8 encoded VTT file content
+
+    Returns:
+        DataFrame: Parsed subtitles with columns (start, end, start_sec, end_sec, text)
+    """
+    parser = VttStreamParser()
+    parser.feed(data)
+    return parser.close()
 
-    try:
-        for caption in webvtt.read(vtt_path):
-            text = caption.text.strip().replace('\n', ' ')
-            if len(text.split()) >= 2:  # Only keep lines with 2+ words
-                records.append({
-                    "start": caption.start,
-                    "end": caption.end,
-                    "start_sec": timestamp_to_seconds(caption.start),
-                    "end_sec": timestamp_to_seconds(caption.end),
-                    "text": text
-                })
-    except Exception as e:
-        print(f"⚠️ Error parsing VTT file: {e}")
-
-    df = pd.DataFrame(records)
-    if not df.empty:
-        print(f"   📄 Original lines: {len(df)}")
-    return df
+
+# Longest caption overlap searched for when merging (captions are much shorter)
+OVERLAP_TAIL_WORDS = 64
+
+# Never equal to a word (separates the two sides in get_overlap_prefix)
+_OVERLAP_SEPARATOR = object()
 
 
 def get_overlap_prefix(prev_words: list, curr_words: list) -> int:
     """
     Find overlapping words between two lists.
 
+    Computes the longest suffix of prev_words that is also a prefix of
+    curr_words with one KMP prefix-function pass (linear in len(curr_words)).
+
     Args:
-        prev_words: Previous word list
+        prev_words: Previous words (list or deque)
         curr_words: Current word list
 
     Returns:
         int: Number of overlapping words
     """
-    max_overlap = 0
-    min_len = min(len(prev_words), len(curr_words))
-    for i in range(1, min_len + 1):
-        if prev_words[-i:] == curr_words[:i]:
-            max_overlap = i
-    return max_overlap
+    n = min(len(prev_words), len(curr_words))
+    if n == 0:
+        return 0
+
+    # curr_words + separator + tail of prev_words; the separator keeps the
+    # match from running past the end of curr_words
+    pattern = curr_words + [_OVERLAP_SEPARATOR]
+    pattern.extend(islice(prev_words, len(prev_words) - n, None))
+    pi = [0] * len(pattern)
+    for i in range(1, len(pattern)):
+        k = pi[i - 1]
+        while k > 0 and pattern[i] != pattern[k]:
+            k = pi[k - 1]
+        if pattern[i] == pattern[k]:
+            k += 1
+        pi[i] = k
+    return pi[-1]
+
+
+def _merge_overlapping_words(texts: list) -> list:
+    """
+    Merge text segments into one word list, dropping the words each segment repeats.
+
+    Args:
+        texts: List of text segments (non-empty)
+
+    Returns:
+        list: Lowercased merged words
+    """
+    # Lowercase and tokenize every segment once
+    word_lists = [text.lower().split() for text in texts]
+    result_words = word_lists[0]
+
+    # Overlaps are only searched in the most recent words
+    tail = deque(result_words[-OVERLAP_TAIL_WORDS:], maxlen=OVERLAP_TAIL_WORDS)
+
+    for curr_words in word_lists[1:]:
+        overlap = get_overlap_prefix(tail, curr_words)
+        new_words = curr_words[overlap:]
+        result_words.extend(new_words)
+        tail.extend(new_words)
+
+    return result_words
 
 
 def remove_sequential_overlap(texts: list) -> str:
@@ -116,16 +298,7 @@ def remove_sequential_overlap(texts: list) -> str:
     """
     if not texts:
         return ""
-
-    result_words = texts[0].lower().split()
-
-    for i in range(1, len(texts)):
-        curr_words = texts[i].lower().split()
-        overlap = get_overlap_prefix(result_words, curr_words)
-        new_words = curr_words[overlap:] if overlap > 0 else curr_words
-        result_words.extend(new_words)
-
-    return ' '.join(result_words)
+    return ' '.join(_merge_overlapping_words(texts))
 
 
 def merge_by_time_window(df: pd.DataFrame, window_seconds: int = 25) -> pd.DataFrame:
@@ -142,61 +315,41 @@ def merge_by_time_window(df: pd.DataFrame, window_seconds: int = 25) -> pd.DataF
     if df.empty:
         return pd.DataFrame()
 
+    start_sec = df['start_sec'].to_numpy()
+    end_sec = df['end_sec'].to_numpy()
+
+    # Long pause (>3s) before each row, vectorized
+    long_pause = (start_sec[1:] - end_sec[:-1]) > 3.0
+
+    # End segment if: 1) window exceeded or 2) long pause (>3s)
+    # (only the window check depends on the running segment start)
+    bounds = [0]
+    segment_start = start_sec[0]
+    for idx, (row_start, pause) in enumerate(zip(start_sec[1:].tolist(), long_pause.tolist()), start=1):
+        if row_start - segment_start >= window_seconds or pause:
+            bounds.append(idx)
+            segment_start = row_start
+    bounds.append(len(df))
+
+    starts = df['start'].tolist()
+    ends = df['end'].tolist()
+    # Remove [Music], [Applause], etc. per caption; whitespace is normalized
+    # by the tokenization in the merge, so no clean_text pass is needed after it
+    texts = [_BRACKET_RE.sub('', text) for text in df['text'].tolist()]
+
     merged_segments = []
-    current_segment = {
-        'start': df.iloc[0]['start'],
-        'start_sec': df.iloc[0]['start_sec'],
-        'end': df.iloc[0]['end'],
-        'end_sec': df.iloc[0]['end_sec'],
-        'texts': [df.iloc[0]['text']]
-    }
-
-    for idx in range(1, len(df)):
-        row = df.iloc[idx]
-
-        segment_duration = row['start_sec'] - current_segment['start_sec']
-        pause = row['start_sec'] - current_segment['end_sec']
-
-        # End segment if: 1) window exceeded or 2) long pause (>3s)
-        if segment_duration >= window_seconds or pause > 3.0:
-            merged_text = remove_sequential_overlap(current_segment['texts'])
-            merged_text = clean_text(merged_text)
-
-            # Only save segments with 10+ words
-            if merged_text and len(merged_text.split()) >= 10:
-                merged_segments.append({
-                    'start': current_segment['start'],
-                    'end': current_segment['end'],
-                    'text': merged_text
-                })
-
-            # Start new segment
-            current_segment = {
-                'start': row['start'],
-                'start_sec': row['start_sec'],
-                'end': row['end'],
-                'end_sec': row['end_sec'],
-                'texts': [row['text']]
-            }
-        else:
-            # Add to current segment
-            current_segment['texts'].append(row['text'])
-            current_segment['end'] = row['end']
-            current_segment['end_sec'] = row['end_sec']
-
-    # Process last segment
-    if current_segment['texts']:
-        merged_text = remove_sequential_overlap(current_segment['texts'])
-        merged_text = clean_text(merged_text)
-
-        if merged_text and len(merged_text.split()) >= 10:
+    for first, stop in zip(bounds[:-1], bounds[1:]):
+        words = _merge_overlapping_words(texts[first:stop])
+
+        # Only save segments with 10+ words
+        if len(words) >= 10:
             merged_segments.append({
-                'start': current_segment['start'],
-                'end': current_segment['end'],
-                'text': merged_text
+                'start': starts[first],
+                'end': ends[stop - 1],
+                'text': ' '.join(words)
             })
 
-    df_merged = pd.DataFrame(merged_segments)
+    df_merged = pd.DataFrame.from_records(merged_segments)
     if not df_merged.empty:
         print(f"   ⏱  Merged segments ({window_seconds}s window): {len(df_merged)}")
     return df_merged
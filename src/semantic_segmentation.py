@@ -9,11 +9,34 @@ semantic shifts between consecutive sentences.
 Uses all-mpnet-base-v2 model for higher accuracy embeddings.
 """
 
+import os
 import re
+import logging
+import functools
+import threading
 import numpy as np
-from typing import List, Set, Tuple
+from collections import OrderedDict
+from typing import List, Optional, Set, Tuple
 import pandas as pd
 
+from .embedding_cache import EMBEDDING_DTYPE, get_or_compute
+
+logger = logging.getLogger(__name__)
+
+# A sentence is text up to a run of [.!?], or the unpunctuated tail of the text
+_SENT_RE = re.compile(r'([^.!?]*)([.!?]+)|([^.!?]+)\Z')
+
+# Sentence embedding model (all-mpnet-base-v2: more accurate, larger model)
+EMBEDDING_MODEL_NAME = "all-mpnet-base-v2"
+
+# Optional ONNX Runtime embedder for CPU (e.g. an int8-quantized export of the
+# model above); tokenizer files are expected next to the .onnx file
+ONNX_MODEL_PATH = os.getenv('ONNX_EMBEDDING_MODEL', 'models/all-mpnet-base-v2-int8/model_quantized.onnx')
+
+# Sentences per encode batch (larger batches keep a GPU busy)
+ENCODE_BATCH_SIZE_GPU = 128
+ENCODE_BATCH_SIZE_CPU = 32
+
 
 def split_into_sentences(text: str) -> List[str]:
     """
@@ -25,22 +48,13 @@ def split_into_sentences(text: str) -> List[str]:
     Returns:
         List of sentences
     """
-    # Split by sentence endings
-    sentences = re.split(r'([.!?]+)', text)
-
-    # Rebuild sentences with punctuation
+    # One pass: (text, punctuation) per sentence, or the unpunctuated tail
     full_sentences = []
-    for i in range(0, len(sentences) - 1, 2):
-        sentence = sentences[i].strip()
-        if i + 1 < len(sentences):
-            sentence += sentences[i + 1]
+    for body, punct, tail in _SENT_RE.findall(text):
+        sentence = body.strip() + punct if punct else tail.strip()
         if sentence:
             full_sentences.append(sentence)
 
-    # Handle last part if no punctuation
-    if len(sentences) % 2 == 1 and sentences[-1].strip():
-        full_sentences.append(sentences[-1].strip())
-
     return full_sentences
 
 
@@ -49,22 +63,39 @@ def compute_similarities(embeddings) -> List[float]:
     Compute cosine similarity between adjacent sentence embeddings.
 
     Args:
-        embeddings: Numpy array of sentence embeddings
+        embeddings: Numpy array of sentence embeddings (float16 or float32)
 
     Returns:
         List of similarity scores
     """
-    from sklearn.metrics.pairwise import cosine_similarity
+    emb = np.ascontiguousarray(embeddings)
+    if emb.dtype not in (np.float16, np.float32):
+        emb = emb.astype(np.float32)
+    if len(emb) < 2:
+        return []
+
+    try:
+        import simsimd
+    except ImportError:
+        simsimd = None
+
+    if simsimd is not None:
+        # SIMD kernel fuses norms and dot product per pair (returns cosine distances);
+        # float16 input is read as is and accumulated in float32
+        distances = np.asarray(simsimd.cosine(emb[:-1], emb[1:]))
+        return (1.0 - distances).tolist()
 
-    similarities = []
-    for i in range(len(embeddings) - 1):
-        sim = cosine_similarity(
-            embeddings[i].reshape(1, -1),
-            embeddings[i + 1].reshape(1, -1)
-        )[0][0]
-        similarities.append(sim)
+    # numpy has no fast float16 kernels: widen once, accumulate in float32
+    emb = emb.astype(np.float32, copy=False)
 
-    return similarities
+    # Normalize once unless the encoder already returned unit vectors
+    norms = np.linalg.norm(emb, axis=1)
+    if not np.allclose(norms, 1.0, atol=1e-3):
+        emb = emb / np.maximum(norms, 1e-12)[:, None]
+
+    # Cosine similarity of unit vectors = row-wise dot product
+    similarities = np.einsum('ij,ij->i', emb[:-1], emb[1:])
+    return similarities.tolist()
 
 
 def detect_boundaries(similarities: List[float], drop_ratio: float = 0.65, min_gap: int = 5) -> Set[int]:
@@ -84,24 +115,107 @@ def detect_boundaries(similarities: List[float], drop_ratio: float = 0.65, min_g
     if not similarities:
         return boundaries
 
-    running_avg = similarities[0]
+    # Sharp drops: similarity below a fraction of the running average (0.8/0.2 smoothing)
+    sims = np.asarray(similarities, dtype=np.float64)
+    sharp_drops = np.flatnonzero(sims < _running_average(sims, alpha=0.2) * drop_ratio)
+
     last_boundary = -min_gap  # Allow first boundary immediately
 
-    for i, sim in enumerate(similarities):
-        # Detect sharp drop in similarity AND respect minimum gap
-        if sim < running_avg * drop_ratio and (i + 1 - last_boundary) >= min_gap:
+    for i in sharp_drops.tolist():
+        # Respect minimum gap
+        if (i + 1 - last_boundary) >= min_gap:
             boundaries.add(i + 1)
             last_boundary = i + 1
 
-        # Update running average with exponential smoothing
-        running_avg = 0.8 * running_avg + 0.2 * sim
+    return boundaries
+
+
+def _running_average(similarities: List[float], alpha: float = 0.1) -> np.ndarray:
+    """
+    Running average (EWMA) of the similarities seen before each position.
+
+    Args:
+        similarities: List of similarity scores between adjacent sentences
+        alpha: Weight of each new similarity (0.1: avg = 0.9 * avg + 0.1 * sim)
+
+    Returns:
+        np.ndarray: Average before each position (the first position starts at its own value)
+    """
+    sims = np.asarray(similarities, dtype=np.float64)
+    previous = np.empty_like(sims)
+    if not len(sims):
+        return previous
+
+    try:
+        from scipy.signal import lfilter
+
+        # running_avg[i] = (1 - alpha) * running_avg[i - 1] + alpha * sims[i], starting from sims[0]
+        running_avg = lfilter([alpha], [1.0, -(1 - alpha)], sims, zi=[(1 - alpha) * sims[0]])[0]
+        previous[0] = sims[0]
+        previous[1:] = running_avg[:-1]
+    except ImportError:
+        running_avg = sims[0]
+        for i, sim in enumerate(sims.tolist()):
+            previous[i] = running_avg
+            running_avg = (1 - alpha) * running_avg + alpha * sim
+
+    return previous
+
+
+def _compute_drops(similarities: List[float], alpha: float = 0.1) -> np.ndarray:
+    """
+    Drop score per position: how far each similarity falls below the running
+    average (EWMA) of the similarities before it.
+
+    Compute once and pass as drops= to share it between detect_top_boundaries
+    and detect_elbow_boundaries (e.g. when tuning parameters).
+
+    Args:
+        similarities: List of similarity scores between adjacent sentences
+        alpha: EWMA weight of each new similarity (default: 0.1)
+
+    Returns:
+        np.ndarray: Drop score per similarity (the first one is always 0)
+    """
+    sims = np.asarray(similarities, dtype=np.float64)
+    return _running_average(sims, alpha) - sims
+
+
+def _select_spaced_boundaries(candidates: List[int],
+                              num_boundaries: int,
+                              min_gap: int,
+                              num_similarities: int) -> Set[int]:
+    """
+    Pick boundaries in candidate order, skipping any closer than min_gap to one already picked.
+
+    Args:
+        candidates: Boundary indices (1..num_similarities), best first
+        num_boundaries: Maximum number of boundaries to pick
+        min_gap: Minimum sentences between boundaries
+        num_similarities: Number of similarity scores
+
+    Returns:
+        Set of sentence indices where paragraph boundaries should occur
+    """
+    # blocked[i]: i is within min_gap of a picked boundary
+    blocked = np.zeros(num_similarities + 1, dtype=bool)
+    boundaries = set()
+
+    for idx in candidates:
+        if len(boundaries) >= num_boundaries:
+            break
+
+        if not blocked[idx]:
+            boundaries.add(idx)
+            blocked[max(0, idx - min_gap + 1):idx + min_gap] = True
 
     return boundaries
 
 
 def detect_top_boundaries(similarities: List[float], 
                          target_paragraphs: int = 8,
-                         min_gap: int = 10) -> Set[int]:
+                         min_gap: int = 10,
+                         drops: Optional[np.ndarray] = None) -> Set[int]:
     """
     Detect exactly N-1 boundaries for N target paragraphs.
     
@@ -112,6 +226,7 @@ def detect_top_boundaries(similarities: List[float],
         similarities: List of similarity scores between adjacent sentences
         target_paragraphs: Target number of paragraphs (5-10 recommended)
         min_gap: Minimum sentences between boundaries
+        drops: Precomputed _compute_drops(similarities) (computed if None)
 
     Returns:
         Set of sentence indices where paragraph boundaries should occur
@@ -123,44 +238,23 @@ def detect_top_boundaries(similarities: List[float],
     
     # Calculate "drop score" for each position
     # Higher score = bigger topic shift
-    drop_scores = []
-    running_avg = similarities[0]
-    
-    for i, sim in enumerate(similarities):
-        # Drop score = how much lower than running average
-        drop = running_avg - sim
-        drop_scores.append((i + 1, drop, sim))  # (index, drop_score, similarity)
-        
-        # Update running average
-        running_avg = 0.9 * running_avg + 0.1 * sim
+    if drops is None:
+        drops = _compute_drops(similarities)
     
-    # Sort by drop score (biggest drops first)
-    drop_scores.sort(key=lambda x: x[1], reverse=True)
+    # Sort by drop score (biggest drops first); boundary index = position + 1
+    order = np.argsort(-drops, kind='stable')
     
     # Select top boundaries while respecting min_gap
-    boundaries = set()
-    
-    for idx, drop, sim in drop_scores:
-        if len(boundaries) >= num_boundaries:
-            break
-            
-        # Check if this boundary respects min_gap from all existing boundaries
-        valid = True
-        for existing in boundaries:
-            if abs(idx - existing) < min_gap:
-                valid = False
-                break
-        
-        if valid:
-            boundaries.add(idx)
-    
-    return boundaries
+    return _select_spaced_boundaries(
+        (order + 1).tolist(), num_boundaries, min_gap, len(similarities)
+    )
 
 
 def detect_elbow_boundaries(similarities: List[float], 
                            min_gap: int = 15,
                            min_paragraphs: int = 5,
-                           max_paragraphs: int = 12) -> Set[int]:
+                           max_paragraphs: int = 12,
+                           drops: Optional[np.ndarray] = None) -> Set[int]:
     """
     Detect boundaries using elbow method - find where drops become insignificant.
     
@@ -172,6 +266,7 @@ def detect_elbow_boundaries(similarities: List[float],
         min_gap: Minimum sentences between boundaries
         min_paragraphs: Minimum number of paragraphs
         max_paragraphs: Maximum number of paragraphs
+        drops: Precomputed _compute_drops(similarities) (computed if None)
 
     Returns:
         Set of sentence indices where paragraph boundaries should occur
@@ -180,19 +275,14 @@ def detect_elbow_boundaries(similarities: List[float],
         return set()
     
     # Calculate "drop score" for each position
-    drop_scores = []
-    running_avg = similarities[0]
-    
-    for i, sim in enumerate(similarities):
-        drop = running_avg - sim
-        drop_scores.append((i + 1, drop, sim))
-        running_avg = 0.9 * running_avg + 0.1 * sim
+    if drops is None:
+        drops = _compute_drops(similarities)
     
-    # Sort by drop score (biggest drops first)
-    sorted_drops = sorted(drop_scores, key=lambda x: x[1], reverse=True)
+    # Sort by drop score (biggest drops first); boundary index = position + 1
+    order = np.argsort(-drops, kind='stable')
     
     # Get just the drop values for analysis
-    drop_values = [d[1] for d in sorted_drops]
+    drop_values = drops[order]
     
     # Find the elbow: where the drop in drop-values is biggest
     # This indicates where "significant" drops end and "noise" begins
@@ -200,53 +290,33 @@ def detect_elbow_boundaries(similarities: List[float],
         return set()
     
     # Calculate differences between consecutive sorted drops
-    diffs = []
-    for i in range(len(drop_values) - 1):
-        diff = drop_values[i] - drop_values[i + 1]
-        diffs.append((i, diff))
+    diffs = drop_values[:-1] - drop_values[1:]
     
     # Find the biggest "cliff" in drop values (elbow point)
     # Only look within min/max paragraph range
     best_elbow = min_paragraphs - 1
-    best_diff = 0
+    lo = max(min_paragraphs - 1, 0)
+    window = diffs[lo:max(max_paragraphs - 1, 0)]
     
-    for i, diff in diffs:
-        if min_paragraphs - 1 <= i < max_paragraphs - 1:
-            if diff > best_diff:
-                best_diff = diff
-                best_elbow = i + 1  # Number of boundaries to use
+    if len(window) and window.max() > 0:
+        best_elbow = lo + int(np.argmax(window)) + 1  # Number of boundaries to use
     
     # Also consider if drops are all similar (no clear elbow) - use mean+std threshold
-    mean_drop = np.mean(drop_values)
-    std_drop = np.std(drop_values)
-    threshold = mean_drop + 0.5 * std_drop
+    threshold = drops.mean() + 0.5 * drops.std()
     
     # Count how many drops are above threshold
-    significant_count = sum(1 for d in drop_values if d > threshold)
+    significant_count = int((drops > threshold).sum())
     
     # Use whichever gives a reasonable number in range
     num_boundaries = min(max(best_elbow, significant_count), max_paragraphs - 1)
     num_boundaries = max(num_boundaries, min_paragraphs - 1)
     
-    print(f"   📊 Elbow analysis: {num_boundaries} significant topic shifts detected")
+    logger.info("   📊 Elbow analysis: %d significant topic shifts detected", num_boundaries)
     
     # Select boundaries while respecting min_gap
-    boundaries = set()
-    
-    for idx, drop, sim in sorted_drops:
-        if len(boundaries) >= num_boundaries:
-            break
-            
-        valid = True
-        for existing in boundaries:
-            if abs(idx - existing) < min_gap:
-                valid = False
-                break
-        
-        if valid:
-            boundaries.add(idx)
-    
-    return boundaries
+    return _select_spaced_boundaries(
+        (order + 1).tolist(), num_boundaries, min_gap, len(similarities)
+    )
 
 
 def group_into_paragraphs(sentences: List[str],
@@ -264,17 +334,16 @@ def group_into_paragraphs(sentences: List[str],
         List of paragraphs (each paragraph is a list of sentences)
     """
     paragraphs = []
-    current = []
+    start = 0
 
-    for i, sent in enumerate(sentences):
+    for cut in sorted(b for b in boundaries if 0 <= b < len(sentences)):
         # Start new paragraph at boundary (if current has enough sentences)
-        if i in boundaries and len(current) >= min_paragraph_length:
-            paragraphs.append(current)
-            current = []
-
-        current.append(sent)
+        if cut - start >= min_paragraph_length:
+            paragraphs.append(sentences[start:cut])
+            start = cut
 
     # Add remaining sentences
+    current = sentences[start:]
     if current:
         # Merge with previous if too short
         if paragraphs and len(current) < min_paragraph_length:
@@ -291,6 +360,7 @@ def segment_by_semantics(df_merged: pd.DataFrame,
                         max_paragraphs: int = 12,
                         use_gpu: bool = False,
                         extract_titles: bool = True,
+                        use_onnx: Optional[bool] = None,
                         **kwargs) -> Tuple[List[List[str]], List[str]]:
     """
     Segment transcript into semantic paragraphs based on topic shifts.
@@ -305,17 +375,29 @@ def segment_by_semantics(df_merged: pd.DataFrame,
         max_paragraphs: Maximum number of paragraphs (default: 12)
         use_gpu: Whether to use GPU for embeddings
         extract_titles: Whether to extract topic titles for each paragraph
+        use_onnx: Embed with ONNX Runtime on CPU instead of sentence-transformers
+                  (default: when ONNX_EMBEDDING_MODEL is set; ignored with use_gpu)
 
     Returns:
         Tuple of (paragraphs, titles):
             - paragraphs: List of paragraphs (each paragraph is a list of sentences)
             - titles: List of topic titles for each paragraph
     """
+    if use_onnx is None:
+        use_onnx = bool(os.getenv('ONNX_EMBEDDING_MODEL'))
+    use_onnx = use_onnx and not use_gpu
+
     try:
-        from sentence_transformers import SentenceTransformer
+        # Availability check; models are loaded in _get_onnx_embedder / _get_st_model
+        if use_onnx:
+            import onnxruntime  # noqa: F401
+            import transformers  # noqa: F401
+        else:
+            import sentence_transformers  # noqa: F401
     except ImportError:
-        print("⚠️  sentence-transformers not installed. Falling back to simple segmentation.")
-        print("   Install with: pip install sentence-transformers")
+        package = "onnxruntime transformers" if use_onnx else "sentence-transformers"
+        logger.warning("⚠️  %s not installed. Falling back to simple segmentation.", package)
+        logger.warning("   Install with: pip install %s", package)
         paragraphs = fallback_segmentation(df_merged)
         titles = [f"Topic {i+1}" for i in range(len(paragraphs))]
         return paragraphs, titles
@@ -329,21 +411,31 @@ def segment_by_semantics(df_merged: pd.DataFrame,
     if len(sentences) < 2:
         return [sentences], ["Topic 1"]
 
-    print(f"   📝 Processing {len(sentences)} sentences...")
+    logger.info("   📝 Processing %d sentences...", len(sentences))
 
-    # Load model (all-mpnet-base-v2: more accurate, larger model)
+    # Load model (all-mpnet-base-v2: more accurate, larger model; once per process)
     device = 'cuda' if use_gpu else 'cpu'
-    model = SentenceTransformer("all-mpnet-base-v2", device=device)
-
-    # Generate embeddings
-    print("   🧠 Generating semantic embeddings...")
-    embeddings = model.encode(sentences, normalize_embeddings=True, show_progress_bar=False)
+    if use_onnx:
+        model = _get_onnx_embedder(ONNX_MODEL_PATH)
+        model_name = f"onnx:{os.path.abspath(ONNX_MODEL_PATH)}"  # Own embedding cache
+    else:
+        model = _get_st_model(EMBEDDING_MODEL_NAME, device)
+        model_name = EMBEDDING_MODEL_NAME
+
+    # Generate embeddings (cached on disk per sentence; only new ones are encoded).
+    # On GPU the next batch is tokenized while the current one runs.
+    logger.info("   🧠 Generating semantic embeddings...")
+    encoder = _PrefetchingEncoder(model) if device == 'cuda' else model
+    embeddings = get_or_compute(
+        sentences, encoder, model_name,
+        batch_size=ENCODE_BATCH_SIZE_GPU if use_gpu else ENCODE_BATCH_SIZE_CPU
+    )
 
     # Compute similarities between consecutive sentences
     similarities = compute_similarities(embeddings)
     
     # Find boundaries using elbow method (automatic detection)
-    print(f"   🎯 Finding significant topic boundaries (elbow method)...")
+    logger.info("   🎯 Finding significant topic boundaries (elbow method)...")
     boundaries = detect_elbow_boundaries(
         similarities, 
         min_gap=min_gap,
@@ -352,71 +444,349 @@ def segment_by_semantics(df_merged: pd.DataFrame,
     )
     paragraphs = group_into_paragraphs(sentences, boundaries, min_paragraph_length=5)
     
-    print(f"   ✅ Created {len(paragraphs)} semantic paragraphs")
+    logger.info("   ✅ Created %d semantic paragraphs", len(paragraphs))
 
     # Extract topic titles
     titles = []
     if extract_titles:
-        print("   🏷️  Extracting topic titles...")
-        titles = extract_topic_titles(paragraphs, model=model)
+        logger.info("   🏷️  Extracting topic titles...")
+        titles = extract_topic_titles(paragraphs, model=model, use_gpu=use_gpu)
         for i, title in enumerate(titles):
-            print(f"      {i+1}. {title}")
+            logger.info("      %d. %s", i + 1, title)
     else:
         titles = [f"Topic {i+1}" for i in range(len(paragraphs))]
 
     return paragraphs, titles
 
 
-def extract_topic_titles(paragraphs: List[List[str]], model=None) -> List[str]:
+# Guards the model singleton so concurrent callers load each model once
+_model_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=4)
+def _load_st_model(name: str, device: str):
+    """Load a SentenceTransformer (memoized; call through _get_st_model)."""
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(name, device=device)
+    if device == 'cuda':
+        # Half precision on GPU: half the memory traffic, faster matmuls
+        model.half()
+    return model
+
+
+def _get_st_model(name: str, device: str):
     """
-    Extract topic titles for each paragraph using KeyBERT.
-    
+    Get a SentenceTransformer, loaded once per (model name, device).
+
+    Args:
+        name: Sentence-transformers model name
+        device: 'cuda' or 'cpu'
+
+    Returns:
+        SentenceTransformer: Shared model
+    """
+    with _model_lock:
+        return _load_st_model(name, device)
+
+
+class _PrefetchingEncoder:
+    """
+    SentenceTransformer encoder that tokenizes the next batch on a worker
+    thread while the current batch runs through the model.
+
+    Meant for GPU models, where the device would otherwise wait for the
+    tokenizer between batches. Exposes the encode() subset used by
+    get_or_compute.
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def encode(self, sentences: List[str], batch_size: int = 32,
+               normalize_embeddings: bool = True, **kwargs) -> np.ndarray:
+        """
+        Encode sentences batch by batch, prefetching the tokenization.
+
+        Args:
+            sentences: Sentences to embed
+            batch_size: Sentences per forward pass
+            normalize_embeddings: Return unit-length embeddings
+            **kwargs: Other SentenceTransformer.encode options (ignored)
+
+        Returns:
+            np.ndarray: float16 embeddings, one row per sentence
+        """
+        import torch
+        from concurrent.futures import ThreadPoolExecutor
+
+        model = self.model
+        batches = [sentences[i:i + batch_size] for i in range(0, len(sentences), batch_size)]
+        # Rows are written in place (no per-batch arrays to concatenate)
+        embeddings = np.empty((len(sentences), model.get_sentence_embedding_dimension()), dtype=np.float16)
+
+        with ThreadPoolExecutor(max_workers=1) as tokenizer:
+            pending = tokenizer.submit(model.tokenize, batches[0]) if batches else None
+            for n, batch in enumerate(batches):
+                features = pending.result()
+                if n + 1 < len(batches):
+                    pending = tokenizer.submit(model.tokenize, batches[n + 1])
+
+                features = {key: value.to(model.device) if isinstance(value, torch.Tensor) else value
+                            for key, value in features.items()}
+                with torch.inference_mode():
+                    batch_embeddings = model(features)['sentence_embedding']
+                if normalize_embeddings:
+                    batch_embeddings = torch.nn.functional.normalize(batch_embeddings, dim=1)
+
+                embeddings[n * batch_size:n * batch_size + len(batch)] = batch_embeddings.float().cpu().numpy()
+
+        return embeddings
+
+
+class _OnnxEmbedder:
+    """
+    Sentence embedder running an ONNX export of the model with ONNX Runtime on CPU.
+
+    Pools like sentence-transformers (mean over the tokens), so an int8-quantized
+    export of EMBEDDING_MODEL_NAME can stand in for the SentenceTransformer.
+    Exposes the encode() subset used by get_or_compute and title extraction.
+
+    Export example:
+        optimum-cli export onnx --model sentence-transformers/all-mpnet-base-v2 models/all-mpnet-base-v2
+        optimum-cli onnxruntime quantize --onnx_model models/all-mpnet-base-v2 --avx512_vnni -o models/all-mpnet-base-v2-int8
+    """
+
+    def __init__(self, model_path: str, max_length: int = 384):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.session = ort.InferenceSession(model_path, providers=['CPUExecutionProvider'])
+        self.tokenizer = AutoTokenizer.from_pretrained(os.path.dirname(os.path.abspath(model_path)))
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.output_names = [node.name for node in self.session.get_outputs()]
+        self.max_length = max_length
+
+    def encode(self, sentences: List[str], batch_size: int = 32,
+               normalize_embeddings: bool = True, **kwargs) -> np.ndarray:
+        """
+        Encode sentences in batches.
+
+        Args:
+            sentences: Sentences to embed
+            batch_size: Sentences per inference run
+            normalize_embeddings: Return unit-length embeddings
+            **kwargs: Other SentenceTransformer.encode options (ignored)
+
+        Returns:
+            np.ndarray: float32 embeddings, one row per sentence
+        """
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            tokens = self.tokenizer(
+                sentences[start:start + batch_size],
+                padding=True, truncation=True, max_length=self.max_length, return_tensors='np'
+            )
+            inputs = {name: value.astype(np.int64) for name, value in tokens.items() if name in self.input_names}
+
+            if 'sentence_embedding' in self.output_names:
+                batches.append(self.session.run(['sentence_embedding'], inputs)[0])
+                continue
+
+            # Mean pooling of the token embeddings (padding excluded)
+            hidden = self.session.run(self.output_names[:1], inputs)[0]
+            mask = tokens['attention_mask'][:, :, None].astype(np.float32)
+            batches.append((hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9))
+
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+
+        embeddings = np.concatenate(batches).astype(np.float32, copy=False)
+        if normalize_embeddings:
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings
+
+
+@functools.lru_cache(maxsize=4)
+def _load_onnx_embedder(model_path: str) -> _OnnxEmbedder:
+    """Load an ONNX embedder (memoized; call through _get_onnx_embedder)."""
+    return _OnnxEmbedder(model_path)
+
+
+def _get_onnx_embedder(model_path: str) -> _OnnxEmbedder:
+    """
+    Get an ONNX Runtime embedder, loaded once per model file.
+
+    Args:
+        model_path: Path to the .onnx model (tokenizer files in the same directory)
+
+    Returns:
+        _OnnxEmbedder: Shared embedder
+    """
+    with _model_lock:
+        return _load_onnx_embedder(model_path)
+
+
+# Memoized titles per (embedding model, paragraph text), least recently used evicted first
+_TITLE_CACHE_SIZE = 4096
+_title_cache: "OrderedDict[tuple, Optional[str]]" = OrderedDict()
+_title_cache_lock = threading.Lock()
+
+# Embeddings of candidate phrases per (embedding model, phrase), least recently
+# used evicted first; common phrases recur across paragraphs and transcripts
+_CANDIDATE_CACHE_SIZE = 20000
+_candidate_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_candidate_cache_lock = threading.Lock()
+
+
+def _candidate_embeddings(model, phrases: List[str], batch_size: int) -> np.ndarray:
+    """
+    Get normalized embeddings of candidate phrases, encoding only the ones not seen before.
+
+    Args:
+        model: Sentence-transformer model (or ONNX embedder)
+        phrases: Distinct candidate phrases
+        batch_size: Encode batch size for new phrases
+
+    Returns:
+        np.ndarray: One float16 embedding row per phrase
+    """
+    rows = {}
+    with _candidate_cache_lock:
+        for phrase in phrases:
+            key = (model, phrase)
+            if key in _candidate_cache:
+                _candidate_cache.move_to_end(key)
+                rows[phrase] = _candidate_cache[key]
+
+    new = [phrase for phrase in phrases if phrase not in rows]
+    if new:
+        vectors = np.asarray(model.encode(
+            new,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        ), dtype=EMBEDDING_DTYPE)
+        rows.update(zip(new, vectors))
+        with _candidate_cache_lock:
+            _candidate_cache.update(((model, phrase), vector) for phrase, vector in zip(new, vectors))
+            while len(_candidate_cache) > _CANDIDATE_CACHE_SIZE:
+                _candidate_cache.popitem(last=False)
+
+    return np.stack([rows[phrase] for phrase in phrases])
+
+
+def _extract_titles_batch(model, texts: List[str], on_gpu: bool = False) -> List[Optional[str]]:
+    """
+    Extract the top keyphrase of several paragraphs (KeyBERT-style, without KeyBERT).
+
+    Candidates are 1-3 word phrases without English stop words. The title is
+    the first MMR pick, which is always the candidate most similar to the
+    paragraph, so every paragraph is scored against every candidate in one
+    matrix product. Paragraphs are embedded in one encode call; each distinct
+    candidate (across all paragraphs) is embedded once and kept for later calls.
+
+    Args:
+        model: Sentence-transformer model
+        texts: Paragraph texts
+        on_gpu: Score on the model's device with torch instead of numpy
+
+    Returns:
+        List of capitalized keyphrases (None where no keyphrase was found)
+    """
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    try:
+        count = CountVectorizer(ngram_range=(1, 3), stop_words='english').fit(texts)
+    except ValueError:
+        return [None] * len(texts)  # Only stop words
+    words = count.get_feature_names_out()
+    contains = count.transform(texts).toarray() > 0
+
+    doc_embeddings = model.encode(
+        texts, convert_to_tensor=on_gpu, normalize_embeddings=True, show_progress_bar=False
+    )
+    word_embeddings = _candidate_embeddings(
+        model, words.tolist(), ENCODE_BATCH_SIZE_GPU if on_gpu else ENCODE_BATCH_SIZE_CPU
+    )
+
+    # Cosine similarity of each paragraph to the candidates it contains
+    if on_gpu:
+        import torch
+        word_embeddings = torch.from_numpy(word_embeddings).to(doc_embeddings.device, doc_embeddings.dtype)
+        scores = doc_embeddings @ word_embeddings.T
+        scores = scores.masked_fill(~torch.from_numpy(contains).to(scores.device), float('-inf'))
+        best = scores.argmax(dim=1).tolist()
+    else:
+        scores = doc_embeddings @ word_embeddings.astype(np.float32).T
+        best = np.where(contains, scores, -np.inf).argmax(axis=1).tolist()
+
+    has_candidates = contains.any(axis=1).tolist()
+    return [words[i].title() if ok else None for i, ok in zip(best, has_candidates)]
+
+
+def _cuda_available() -> bool:
+    """Whether torch is installed and sees a CUDA device."""
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
+
+
+def extract_topic_titles(paragraphs: List[List[str]], model=None, use_gpu: bool = False) -> List[str]:
+    """
+    Extract topic titles for each paragraph (top KeyBERT-style keyphrase).
+
+    All paragraphs are scored in one batch. Titles are memoized per paragraph
+    text, so re-segmenting a transcript only extracts titles for paragraphs
+    that changed.
+
     Args:
         paragraphs: List of paragraphs (each paragraph is a list of sentences)
-        model: Optional sentence-transformer model to reuse
+        model: Optional sentence-transformer model (or ONNX embedder) to reuse
+        use_gpu: Score the keyphrases on the GPU (when CUDA is available)
         
     Returns:
         List of topic titles (noun phrases) for each paragraph
     """
+    on_gpu = use_gpu and _cuda_available()
+
     try:
-        from keybert import KeyBERT
+        import sklearn  # noqa: F401  (candidate phrases)
+        if model is None:
+            # Same model as the segmentation (once per process)
+            model = _get_st_model(EMBEDDING_MODEL_NAME, 'cuda' if on_gpu else 'cpu')
     except ImportError:
-        print("   ⚠️  keybert not installed. Using fallback titles.")
+        logger.warning("   ⚠️  scikit-learn or sentence-transformers not installed. Using fallback titles.")
         return [f"Topic {i+1}" for i in range(len(paragraphs))]
-    
-    # Initialize KeyBERT with the same model
-    if model is not None:
-        kw_model = KeyBERT(model=model)
-    else:
-        kw_model = KeyBERT(model="all-mpnet-base-v2")
-    
-    titles = []
-    
-    for i, paragraph in enumerate(paragraphs):
-        # Combine sentences into one text
-        text = ' '.join(paragraph)
-        
+
+    # Combine sentences into one text per paragraph
+    keys = [(model, ' '.join(paragraph)) for paragraph in paragraphs]
+
+    # Extract titles once for all paragraphs not seen before
+    # (the cache is shared by concurrent requests; extraction runs unlocked)
+    found = {}
+    with _title_cache_lock:
+        for key in keys:
+            if key in _title_cache:
+                _title_cache.move_to_end(key)
+                found[key] = _title_cache[key]
+    missing = list(dict.fromkeys(key for key in keys if key not in found))
+    if missing:
+        extracted = {}
         try:
-            # Extract keyphrases (noun phrases preferred)
-            keywords = kw_model.extract_keywords(
-                text,
-                keyphrase_ngram_range=(1, 3),  # 1-3 word phrases
-                stop_words='english',
-                top_n=3,
-                use_mmr=True,  # Diversity
-                diversity=0.5
-            )
-            
-            if keywords:
-                # Get the top keyphrase and capitalize
-                title = keywords[0][0].title()
-                titles.append(title)
-            else:
-                titles.append(f"Topic {i+1}")
-                
-        except Exception as e:
-            titles.append(f"Topic {i+1}")
-    
+            extracted = dict(zip(missing, _extract_titles_batch(model, [text for _, text in missing], on_gpu)))
+        except Exception:
+            pass  # Numbered fallback titles below
+        found.update(extracted)
+        with _title_cache_lock:
+            _title_cache.update(extracted)
+            while len(_title_cache) > _TITLE_CACHE_SIZE:
+                _title_cache.popitem(last=False)
+
+    # Get the top keyphrase, or a numbered fallback
+    titles = [found.get(key) or f"Topic {i+1}" for i, key in enumerate(keys)]
+
     return titles
 
 
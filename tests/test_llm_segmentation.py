@@ -0,0 +1,244 @@
+"""
+test_llm_segmentation.py
+──────────────────────────────────────────────
+Tests for windowed Gemini segmentation, without calling Gemini.
+
+_segment_window is replaced by a fake that returns the window's rows as
+paragraphs of (title, sentences), so the overlap trim and the merge of
+topics at window boundaries can be checked on crafted windows. The
+streamed-reply parser is fed crafted chunk sequences through a fake model.
+
+Run with: python -m unittest discover tests
+"""
+
+import json
+import time
+import unittest
+import warnings
+from unittest import mock
+
+import pandas as pd
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", FutureWarning)
+    from src import llm_segmentation as llm
+
+
+def _row(i):
+    return f"Row {i} talks about item{i} and thing{i} today."
+
+
+def _sentences(window_text):
+    return [s.strip() + "." for s in window_text.split(".") if s.strip()]
+
+
+def _segment(df, segment_window, **settings):
+    """Run stream_gemini_segments with a fake _segment_window."""
+    settings = {"GEMINI_MIN_ROWS": 0, "GEMINI_MIN_CHARS": 0, **settings}
+    with mock.patch.object(llm, "_segment_window", segment_window), \
+            mock.patch.multiple(llm, **settings):
+        return list(llm.stream_gemini_segments(df))
+
+
+class OverlapLengthTest(unittest.TestCase):
+
+    PREV = "we talked about the model and now we look at the data".split()
+    NEXT = "and now we look at the data that we collected last week".split()
+
+    def test_exact_overlap(self):
+        self.assertEqual(llm._overlap_length(self.PREV, self.NEXT, 7), 7)
+
+    def test_perturbed_overlap(self):
+        # Typo fixed and a filler word dropped inside the overlap
+        words = "and now look at the date that we collected last week".split()
+        self.assertEqual(llm._overlap_length(self.PREV, words, 7), 6)
+
+    def test_typo_in_last_overlap_word(self):
+        words = "and now we look at the dta that we collected last week".split()
+        self.assertEqual(llm._overlap_length(self.PREV, words, 7), 7)
+
+    def test_no_overlap_falls_back_to_row_estimate(self):
+        words = "completely different words appear in this next window here".split()
+        self.assertEqual(llm._overlap_length(self.PREV, words, 7), 7)
+        self.assertEqual(llm._overlap_length([], words, 7), 7)
+
+    def test_no_expected_overlap(self):
+        self.assertEqual(llm._overlap_length(self.PREV, self.NEXT, 0), 0)
+
+
+class WindowOverlapTest(unittest.TestCase):
+    """300 rows: windows 0-199 and 180-299 share rows 180-199."""
+
+    ROWS = [_row(i) for i in range(300)]
+
+    def _run(self, perturb=None):
+        def segment_window(window_text, api_key=None):
+            sentences = _sentences(window_text)
+            if perturb and sentences[0].startswith("Row 180"):
+                perturb(sentences)
+            return [(f"Topic {j}", sentences[j:j + 10]) for j in range(0, len(sentences), 10)]
+
+        df = pd.DataFrame({"text": self.ROWS})
+        return [s for _, sentences in _segment(df, segment_window) for s in sentences]
+
+    def test_exact_windows(self):
+        self.assertEqual(self._run(), self.ROWS)
+
+    def test_perturbed_overlap_is_emitted_once(self):
+        def perturb(sentences):
+            sentences[5] = sentences[5].replace("talks", "speaks")
+            sentences[7] = sentences[7].replace(" today", "")
+        self.assertEqual(self._run(perturb), self.ROWS)
+
+    def test_unaligned_overlap_trims_row_estimate(self):
+        def perturb(sentences):
+            # Gemini paraphrased the whole overlap (same word count)
+            for k in range(20):
+                sentences[k] = f"Paraphrase {k} of the very same idea here."
+        self.assertEqual(self._run(perturb), self.ROWS)
+
+
+class BoundaryMergeTest(unittest.TestCase):
+    """Windows of 4 rows sharing 1 row: rows 0-3, 3-6 and 6-9."""
+
+    ROWS = [
+        "intro to the course.", "what we will build.",
+        "gradient descent step size.", "gradient descent learning rate.",
+        "gradient descent step rate.", "now the data loader.",
+        "batches and shuffling.", "evaluation on held out data.",
+        "accuracy and loss curves.", "thanks for watching.",
+    ]
+
+    def _run(self, windows, delays=None, **settings):
+        """windows: paragraphs per window, keyed by the window's first row."""
+        def segment_window(window_text, api_key=None):
+            first = _sentences(window_text)[0]
+            time.sleep((delays or {}).get(first, 0))
+            return [(title, list(sentences)) for title, sentences in windows[first]]
+
+        df = pd.DataFrame({"text": self.ROWS})
+        settings = {"WINDOW_ROWS": 4, "WINDOW_OVERLAP_ROWS": 1, **settings}
+        return _segment(df, segment_window, **settings)
+
+    def _windows(self):
+        r = self.ROWS
+        return {
+            r[0]: [("Intro", r[0:2]), ("Gradient descent", r[2:4])],
+            r[3]: [("Step rate", r[3:5]), ("Data loading", r[5:7])],
+            r[6]: [("Batches", r[6:7]), ("Evaluation", r[7:10])],
+        }
+
+    def test_window_order_is_kept(self):
+        # The first window finishes last
+        result = self._run(self._windows(), delays={self.ROWS[0]: 0.05}, BOUNDARY_MERGE_JACCARD=1.1)
+
+        self.assertEqual([title for title, _ in result],
+                         ["Intro", "Gradient descent", "Step rate", "Data loading", "Evaluation"])
+        self.assertEqual([s for _, sentences in result for s in sentences], self.ROWS)
+
+    def test_similar_boundary_topics_are_merged(self):
+        r = self.ROWS
+        similarity = llm._jaccard(r[2:4], r[4:5])
+        result = self._run(self._windows(), BOUNDARY_MERGE_JACCARD=similarity)
+
+        self.assertEqual(result[1], ("Gradient descent", r[2:5]))
+        self.assertEqual([title for title, _ in result],
+                         ["Intro", "Gradient descent", "Data loading", "Evaluation"])
+
+    def test_dissimilar_boundary_topics_are_kept_apart(self):
+        r = self.ROWS
+        similarity = llm._jaccard(r[2:4], r[4:5])
+        result = self._run(self._windows(), BOUNDARY_MERGE_JACCARD=similarity + 0.01)
+
+        self.assertEqual(result[1:3], [("Gradient descent", r[2:4]), ("Step rate", r[4:5])])
+
+    def test_window_empty_after_trim_is_skipped(self):
+        r = self.ROWS
+        windows = self._windows()
+        # Only the overlap row came back for the middle window
+        windows[r[3]] = [("Repeat", r[3:4])]
+        result = self._run(windows, BOUNDARY_MERGE_JACCARD=1.1)
+
+        # The last window cannot align with the skipped one, so its
+        # overlap row is trimmed by the row estimate
+        self.assertEqual(result, [
+            ("Intro", r[0:2]),
+            ("Gradient descent", r[2:4]),
+            ("Evaluation", r[7:10]),
+        ])
+
+
+SEGMENTS = [
+    {"title": "Setup {and} braces", "text": "Install it with \"pip\" [then] run {it}."},
+    {"title": "Back\\slash", "text": "Paths like C:\\data} and a quote \" at the end\\"},
+]
+RESPONSE = json.dumps({"segments": SEGMENTS})
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class _FakeModel:
+    """Streams a fixed reply in the given chunks, like generate_content(stream=True)."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def generate_content(self, text, stream=False):
+        return [mock.Mock(text=chunk) for chunk in self.chunks]
+
+
+def _stream(chunks):
+    """Run _stream_text_segments against a fake model (no cache)."""
+    with mock.patch.object(llm, "get_gemini_model", return_value=_FakeModel(chunks)), \
+            mock.patch.object(llm, "read_cache", return_value=None), \
+            mock.patch.object(llm, "write_cache"):
+        return list(llm._stream_text_segments("transcript"))
+
+
+class SegmentStreamParserTest(unittest.TestCase):
+
+    def test_segments_split_across_chunks(self):
+        for size in (1, 2, 7, 64, len(RESPONSE)):
+            parser = llm._SegmentStreamParser()
+            segments = []
+            for chunk in _chunks(RESPONSE, size):
+                segments.extend(parser.feed(chunk))
+            self.assertEqual(segments, SEGMENTS, f"chunk size {size}")
+            self.assertTrue(parser.done)
+
+    def test_segments_arrive_when_complete(self):
+        first_end = RESPONSE.index("}, {") + 1
+        parser = llm._SegmentStreamParser()
+
+        self.assertEqual(parser.feed(RESPONSE[:first_end - 1]), [])
+        self.assertEqual(parser.feed(RESPONSE[first_end - 1:first_end]), SEGMENTS[:1])
+        self.assertEqual(parser.feed(RESPONSE[first_end:]), SEGMENTS[1:])
+
+    def test_code_fenced_response(self):
+        fenced = "Here you go:\n```json\n" + RESPONSE + "\n```\n"
+        self.assertEqual(_stream(_chunks(fenced, 5)), SEGMENTS)
+
+    def test_parse_full_response_code_fence_after_prose_braces(self):
+        fenced = "Segments {as requested}:\n```json\n" + RESPONSE + "\n```"
+        self.assertEqual(llm._parse_full_response(fenced), SEGMENTS)
+
+    def test_unstreamable_response_is_parsed_whole(self):
+        # No "segments" array to stream: the whole reply is parsed at the end
+        reply = '```json\n{"segments": {"0": 1}}\n```'
+        with mock.patch.object(llm, "_parse_full_response", return_value=SEGMENTS) as parse:
+            self.assertEqual(_stream(_chunks(reply, 4)), SEGMENTS)
+        parse.assert_called_once_with(reply)
+
+    def test_unterminated_response_raises(self):
+        truncated = RESPONSE[:RESPONSE.index("}, {") - 5]
+        with mock.patch.object(llm, "_parse_full_response", wraps=llm._parse_full_response) as parse:
+            with self.assertLogs(llm.logger, "WARNING"), \
+                    self.assertRaisesRegex(Exception, "No segments found"):
+                _stream(_chunks(truncated, 3))
+        parse.assert_called_once_with(truncated)
+
+
+if __name__ == "__main__":
+    unittest.main()
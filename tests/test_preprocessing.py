@@ -0,0 +1,95 @@
+"""
+test_preprocessing.py
+──────────────────────────────────────────────
+Regression tests for VTT parsing and time-window merging.
+
+The fixture follows YouTube's auto-caption layout: each caption burst opens
+with a cue whose first text line is " " (dropped, as webvtt-py did), followed
+by 10 ms "static" cues and rolling two-line cues.
+
+Run with: python -m unittest discover tests
+"""
+
+import contextlib
+import io
+import os
+import unittest
+
+from src.preprocessing import VttStreamParser, merge_by_time_window, parse_vtt_file, parse_vtt_string
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "youtube_auto_captions.vtt")
+
+# Rows webvtt-py (the previous parser) produced for the fixture
+EXPECTED_ROWS = [
+    ("00:00:02.869", "00:00:02.879", "hello everyone and welcome back"),
+    ("00:00:02.879", "00:00:05.910", "hello everyone and welcome back to the channel today we're looking"),
+    ("00:00:05.910", "00:00:05.920", "to the channel today we're looking"),
+    ("00:00:05.920", "00:00:08.549", "to the channel today we're looking at how transformers actually work"),
+    ("00:00:08.549", "00:00:08.559", "at how transformers actually work"),
+    ("00:00:15.749", "00:00:15.759", "so let's start with attention"),
+    ("00:00:15.759", "00:00:18.310", "so let's start with attention the idea is surprisingly simple"),
+    ("00:00:18.310", "00:00:18.320", "the idea is surprisingly simple"),
+]
+
+
+def _quiet(func, *args, **kwargs):
+    """Call func with its progress prints suppressed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def _rows(df):
+    return list(zip(df["start"].astype(str), df["end"].astype(str), df["text"]))
+
+
+class ParseYouTubeAutoCaptionsTest(unittest.TestCase):
+
+    def test_burst_opening_cues_are_dropped(self):
+        df = _quiet(parse_vtt_file, FIXTURE)
+
+        self.assertEqual(_rows(df), EXPECTED_ROWS)
+        self.assertAlmostEqual(float(df["start_sec"].iloc[0]), 2.869, places=3)
+        self.assertAlmostEqual(float(df["end_sec"].iloc[-1]), 18.32, places=3)
+
+    def test_streamed_chunks_match_whole_file(self):
+        with open(FIXTURE, "rb") as f:
+            data = f.read()
+
+        for chunk_size in (1, 7, 64, 4096):
+            parser = VttStreamParser()
+            for i in range(0, len(data), chunk_size):
+                parser.feed(data[i:i + chunk_size])
+            df = _quiet(parser.close)
+            self.assertEqual(_rows(df), EXPECTED_ROWS, f"chunk size {chunk_size}")
+
+    def test_merged_windows(self):
+        df_merged = _quiet(merge_by_time_window, _quiet(parse_vtt_file, FIXTURE))
+
+        self.assertEqual(_rows(df_merged), [
+            ("00:00:02.869", "00:00:08.559",
+             "hello everyone and welcome back to the channel today we're looking at how transformers actually work"),
+            ("00:00:15.749", "00:00:18.320",
+             "so let's start with attention the idea is surprisingly simple"),
+        ])
+
+
+class LongStreamTimestampsTest(unittest.TestCase):
+
+    VTT = (
+        "WEBVTT\n\n"
+        "08:20:00.001 --> 11:06:40.999\n"
+        "first cue here\n\n"
+        "11:06:40.999 --> 11:07:05.999\n"
+        "second cue here\n"
+    )
+
+    def test_seconds_keep_milliseconds_past_float32_range(self):
+        df = _quiet(parse_vtt_string, self.VTT)
+
+        self.assertEqual(df["start_sec"].dtype, "float64")
+        self.assertEqual(df["start_sec"].tolist(), [30000.001, 40000.999])
+        self.assertEqual(df["end_sec"].tolist(), [40000.999, 40025.999])
+
+
+if __name__ == "__main__":
+    unittest.main()